@@ -0,0 +1,400 @@
+"""
+Benchmarks for the data loading and plot-building pipeline.
+
+Run from the project root:
+
+    python benchmarks/bench.py                 # all benchmarks, scales 1, 10, 100
+    python benchmarks/bench.py --scales 1 10   # only some scales
+    python benchmarks/bench.py --compare       # compare with the previous result file
+    python benchmarks/bench.py --only excel    # Excel engines: speed and parity with openpyxl
+    python benchmarks/bench.py --synthetic 10 --resolution daily --cantons 100
+                                               # generated data instead of Data/
+
+Every run is stored as benchmarks/results/<timestamp>_<commit>.json, so
+regressions between commits can be compared. The script exits with status 1
+if an Excel engine returns other frames than openpyxl.
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+os.chdir(ROOT)
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+import excel_reader
+import utils
+from canton_store import CantonStore
+from snapshots import WORKBOOKS, build_snapshot
+from plots import dataset1_plots, dataset2_plots, dataset3_plots
+from plots.export import figure_exporter
+from plots.prep import derived_cache
+from synthetic_data import write_synthetic_data
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+DATA_DIR = "Data"
+DATASET2_MAX_YEAR_FACTOR = 10
+
+
+def measure(func, repeat=3):
+    """Median wall time over repeat runs and the peak traced memory of one extra run."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        derived_cache.invalidate()
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+
+    derived_cache.invalidate()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": statistics.median(times), "peak_bytes": peak}, result
+
+
+def output_stats(result):
+    """Serialised size of a plot result (Bokeh json_item or PNG); for Bokeh also the size of its data sources."""
+    from bokeh.model import Model
+
+    if isinstance(result, Model):
+        from plots.sources import payload_report
+        report = payload_report(result)
+        return {"output_bytes": report.pop("payload_bytes"), **report}
+    if hasattr(result, "savefig"):
+        import io
+        import matplotlib.pyplot as plt
+        buffer = io.BytesIO()
+        result.savefig(buffer, format="png")
+        plt.close(result)
+        return {"output_bytes": len(buffer.getvalue())}
+    return {}
+
+
+# --- Synthetic scaling ---------------------------------------------------------
+
+def _tile_years(df, column, factor):
+    # Jahresspalten können Fussnoten-Zeilen (Text) enthalten: nur Zahlen verschieben
+    years = pd.to_numeric(df[column], errors="coerce")
+    span = int(years.max() - years.min() + 1)
+    parts = []
+    for k in range(factor):
+        part = df.copy()
+        shifted = years + k * span
+        part[column] = shifted.astype("Int64") if k else df[column]
+        if years.isna().any():
+            part[column] = part[column].astype(object).where(years.notna(), df[column])
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+
+def _add_cantons(df, cantons, factor):
+    extra = {f"{c}_{k}": df[c] for k in range(1, factor) for c in cantons}
+    return pd.concat([df, pd.DataFrame(extra, index=df.index)], axis=1)
+
+
+def _shift_dates(series, days):
+    # Mikrosekunden-Auflösung: 100-fach gekachelte Zeiträume laufen über das Jahr 2262 hinaus
+    return series.astype("datetime64[us]") + np.timedelta64(int(days), "D")
+
+
+def _tile_weeks(df, factor):
+    span = (df["StartReportingPeriod"].max() - df["StartReportingPeriod"].min()).days + 7
+    parts = []
+    for k in range(factor):
+        part = df.copy()
+        part["StartReportingPeriod"] = _shift_dates(part["StartReportingPeriod"], k * span)
+        part["EndReportingPeriod"] = _shift_dates(part["EndReportingPeriod"], k * span)
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+
+def scaled_data(data, factor):
+    """Real datasets scaled up factor times in years (dataset 2: years and cantons)."""
+    if factor == 1:
+        return {name: data[name] for name in data if name != "data_set3" and _available(data, name)}
+
+    mortality = data["data_set2_mortality"]
+    cantons = [c for c in mortality.columns if c not in ("Month", "Year", "Parameter", "CH")]
+    weekly = data["data_set2_incidence_weekly"]
+    # Datensatz 2 arbeitet mit Nanosekunden-Daten (bis 2262): höchstens 10-fach in
+    # der Zeit kacheln, der Rest des Faktors geht in zusätzliche Kantone
+    years = min(factor, DATASET2_MAX_YEAR_FACTOR)
+    scaled = {
+        "data_set1": _tile_years(data["data_set1"], "Jahr", factor),
+        "data_set2_mortality": _add_cantons(_tile_years(mortality, "Year", years), cantons, factor),
+        "data_set2_incidence_weekly": _add_cantons(_tile_weeks(weekly, years), cantons, factor),
+        "data_set2_population": data["data_set2_population"],
+        "data_set3_cleaned": _tile_years(data["data_set3_cleaned"], "Jahr", factor),
+        "dataset3_infectdata": _tile_years(data["dataset3_infectdata"], "Year", factor),
+    }
+    if _available(data, "data_covid"):
+        covid = data["data_covid"]
+        span = (covid["date"].max() - covid["date"].min()).days + 1
+        parts = [covid.assign(date=_shift_dates(covid["date"], k * span)) for k in range(factor)]
+        scaled["data_covid"] = pd.concat(parts, ignore_index=True)
+    return scaled
+
+
+def _available(data, name):
+    try:
+        data[name]
+    except FileNotFoundError:
+        return False
+    return True
+
+
+# --- Benchmarks ----------------------------------------------------------------
+
+PLOTS = {
+    "pandemic_death_rate_barplot": (dataset1_plots.pandemic_death_rate_barplot, ["data_set1"]),
+    "plot_mortality_vs_population": (dataset1_plots.plot_mortality_vs_population, ["data_set1"]),
+    "plot_covid_death": (dataset1_plots.plot_covid_death, ["data_covid"]),
+    "plot_excess_mortality": (dataset1_plots.plot_excess_mortality, ["data_set1"]),
+    "plot_deaths_comparison": (dataset2_plots.plot_deaths_comparison, ["data_set2_mortality"]),
+    "plot_influenza_share": (dataset2_plots.plot_influenza_share, ["data_set2_mortality"]),
+    "plot_weekly_cases": (dataset2_plots.plot_weekly_cases, ["data_set2_incidence_weekly"]),
+    "plot_monthly_cases_and_deaths": (dataset2_plots.plot_monthly_cases_and_deaths, ["data_set2_incidence_weekly", "data_set2_mortality"]),
+    "plot_major_causes_over_time": (dataset3_plots.plot_major_causes_over_time, ["data_set3_cleaned"]),
+    "plot_year_comparison_barplot": (dataset3_plots.plot_year_comparison_barplot, ["data_set3_cleaned"]),
+    "plot_infectious_diseases": (dataset3_plots.plot_infectious_diseases, ["dataset3_infectdata"]),
+}
+
+
+def bench_loaders(tmp_dir, repeat, data_dir=DATA_DIR):
+    results = {}
+    for name, workbook in WORKBOOKS.items():
+        path = os.path.join(data_dir, workbook)
+        results[f"read_excel[{name}]"], _ = measure(lambda: pd.read_excel(path), repeat)
+
+        snapshot_base = os.path.join(tmp_dir, "snapshots_src")
+        os.makedirs(snapshot_base, exist_ok=True)
+        shutil.copy2(path, snapshot_base)
+        build_snapshot(workbook, snapshot_base)
+        from snapshots import read_workbook
+        copy = os.path.join(snapshot_base, workbook)
+        results[f"read_snapshot[{name}]"], _ = measure(lambda: read_workbook(copy), repeat)
+
+    covid_path = os.path.join(data_dir, "full_data.csv")
+    if os.path.exists(covid_path):
+        results["read_covid_data[pyarrow]"], _ = measure(lambda: utils.read_covid_data(covid_path, engine="pyarrow"), repeat)
+        results["read_covid_data[chunked]"], _ = measure(lambda: utils.read_covid_data(covid_path, engine="chunked"), repeat)
+
+    def cold_load():
+        utils.clear_data_cache()
+        data = utils.load_all_data(base_path=data_dir)
+        return {name: data[name] for name in data if name != "data_set3" and _available(data, name)}
+
+    results["load_all_data[cold]"], _ = measure(cold_load, repeat)
+
+    def cold_load_parallel():
+        utils.clear_data_cache()
+        return utils.load_all_data(base_path=data_dir, parallel=True)
+
+    results["load_all_data[cold, parallel]"], _ = measure(cold_load_parallel, repeat)
+    data = utils.load_all_data(base_path=data_dir)
+    warm_load = lambda: {name: data[name] for name in data if _available(data, name)}
+    warm_load()
+    results["load_all_data[warm]"], _ = measure(warm_load, repeat)
+    return results
+
+
+def bench_excel_engines(repeat, data_dir=DATA_DIR):
+    """Times every installed engine on every workbook and checks its frames against openpyxl."""
+    results = {}
+    mismatches = []
+    for name, workbook in WORKBOOKS.items():
+        path = os.path.join(data_dir, workbook)
+        calls = excel_reader.EXCEL_CALLS if name == "data_set3" else {"sheet": {}}
+        for call, kwargs in calls.items():
+            reference = pd.read_excel(path, engine="openpyxl", **kwargs)
+            for engine in excel_reader.available_engines():
+                stats, df = measure(lambda: pd.read_excel(path, engine=engine, **kwargs), repeat)
+                try:
+                    pd.testing.assert_frame_equal(df, reference)
+                    stats["parity"] = True
+                except AssertionError as e:
+                    stats["parity"] = False
+                    mismatches.append(f"{engine} {name} {call}: {str(e).splitlines()[0]}")
+                results[f"excel[{engine}][{name}:{call}]"] = stats
+    for mismatch in mismatches:
+        print(f"PARITY MISMATCH {mismatch}")
+    return results
+
+
+def bench_cleaning(tmp_dir, repeat, data_dir=DATA_DIR):
+    source = os.path.join(data_dir, utils.DATASET3_WORKBOOK)
+    base = os.path.join(tmp_dir, "cleaning")
+    os.makedirs(base, exist_ok=True)
+    shutil.copy2(source, base)
+    copy = os.path.join(base, utils.DATASET3_WORKBOOK)
+    return {
+        "clean_dataset3": measure(lambda: utils.clean_dataset3(copy, os.path.join(base, "a.csv")), repeat)[0],
+        "clean_dataset3_headers": measure(lambda: utils.clean_dataset3_headers(copy, os.path.join(base, "b.csv")), repeat)[0],
+        "refresh_dataset3_outputs[force]": measure(lambda: utils.refresh_dataset3_outputs(base, force=True), repeat)[0],
+        "refresh_dataset3_outputs[fresh]": measure(lambda: utils.refresh_dataset3_outputs(base), repeat)[0],
+    }
+
+
+def bench_plots(data, scales, repeat):
+    results = {}
+    for factor in scales:
+        frames = scaled_data(data, factor)
+        for name, (func, inputs) in PLOTS.items():
+            if any(i not in frames for i in inputs):
+                continue
+            args = [frames[i] for i in inputs]
+            try:
+                stats, result = measure(lambda: func(*args), repeat)
+            except Exception as e:
+                # Festhalten, wo die Pipeline bei grossen Eingaben aussteigt
+                tracemalloc.stop()
+                results[f"{name}[x{factor}]"] = {"error": f"{type(e).__name__}: {e}"}
+                continue
+            stats.update(output_stats(result))
+            results[f"{name}[x{factor}]"] = stats
+        results.update(bench_canton_store(frames, factor, repeat))
+    return results
+
+
+def bench_canton_store(frames, factor, repeat):
+    """Building the CantonStore and one canton lookup in it, against the same filter on the wide frame."""
+    inputs = ["data_set2_mortality", "data_set2_incidence_weekly", "data_set2_population"]
+    if any(i not in frames for i in inputs):
+        return {}
+    results = {}
+    results[f"canton_store.build[x{factor}]"], store = measure(lambda: CantonStore.from_frames(*[frames[i] for i in inputs]), repeat)
+    weekly = frames["data_set2_incidence_weekly"]
+    parameter = weekly["Parameter"].astype(str).str.strip().str.lower()
+    results[f"canton_store.query[x{factor}]"], _ = measure(
+        lambda: store.query("cases influenza", "ZH", "1957-10-01", "1957-12-31"), repeat)
+    results[f"wide_filter[x{factor}]"], _ = measure(
+        lambda: weekly.loc[(parameter == "cases influenza") & weekly["StartReportingPeriod"].between("1957-10-01", "1957-12-31"), "ZH"],
+        repeat)
+    results[f"canton_store.rate_per_100k[x{factor}]"], _ = measure(
+        lambda: store.rate_per_100k("deaths influenza", "ZH", "1957-01-01", "1957-12-31"), repeat)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(results, data_label):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    commit = git_commit()
+    path = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}_{commit}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"commit": commit, "python": sys.version.split()[0], "pandas": pd.__version__,
+                   "data": data_label, "results": results}, f, indent=2, sort_keys=True)
+    return path
+
+
+def compare(current_path):
+    with open(current_path, encoding="utf-8") as f:
+        current = json.load(f)
+    # Nur Läufe auf denselben Daten vergleichen
+    previous = None
+    for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")), reverse=True):
+        if path == current_path:
+            continue
+        with open(path, encoding="utf-8") as f:
+            candidate = json.load(f)
+        if candidate.get("data", DATA_DIR) == current["data"]:
+            previous, previous_path = candidate, path
+            break
+    if previous is None:
+        print("No earlier result to compare with.")
+        return
+
+    print(f"\nCompared with {os.path.basename(previous_path)} (commit {previous['commit']}):")
+    for name, stats in sorted(current["results"].items()):
+        before = previous["results"].get(name)
+        if before is None or "error" in before or "error" in stats:
+            continue
+        ratio = stats["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        flag = "  <-- slower" if ratio > 1.2 else ""
+        print(f"  {name:55s} {before['seconds'] * 1000:9.2f} ms -> {stats['seconds'] * 1000:9.2f} ms  x{ratio:.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", choices=["loaders", "excel", "cleaning", "plots"], nargs="+")
+    parser.add_argument("--compare", action="store_true", help="Compare with the previous result file")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Directory with the source files (default: Data)")
+    parser.add_argument("--synthetic", type=int, metavar="SCALE",
+                        help="Benchmark synthetic data of this scale (see src/synthetic_data.py) instead of --data-dir")
+    parser.add_argument("--cantons", type=int, default=25, help="Cantons in the synthetic data")
+    parser.add_argument("--resolution", choices=["weekly", "daily"], default="weekly", help="Incidence period in the synthetic data")
+    parser.add_argument("--countries", type=int, default=1, help="Locations in the synthetic full_data.csv")
+    args = parser.parse_args()
+
+    only = set(args.only or ["loaders", "excel", "cleaning", "plots"])
+    tmp_dir = tempfile.mkdtemp(prefix="podsv_bench_")
+    # Exportierte PNGs nicht in src/plots/save_figures schreiben
+    figure_exporter.configure(directory=os.path.join(tmp_dir, "figures"))
+
+    data_dir, data_label = args.data_dir, args.data_dir
+    results = {}
+    try:
+        if args.synthetic:
+            data_dir = os.path.join(tmp_dir, "synthetic")
+            data_label = (f"synthetic scale={args.synthetic} cantons={args.cantons} "
+                          f"resolution={args.resolution} countries={args.countries}")
+            write_synthetic_data(data_dir, args.synthetic, args.cantons, args.resolution, args.countries)
+        if "loaders" in only:
+            results.update(bench_loaders(tmp_dir, args.repeat, data_dir))
+        if "excel" in only:
+            results.update(bench_excel_engines(args.repeat, data_dir))
+        if "cleaning" in only:
+            results.update(bench_cleaning(tmp_dir, args.repeat, data_dir))
+        if "plots" in only:
+            results.update(bench_plots(utils.load_all_data(base_path=data_dir), args.scales, args.repeat))
+        figure_exporter.wait()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    for name, stats in results.items():
+        if "error" in stats:
+            print(f"{name:55s} FAILED  {stats['error'][:80]}")
+            continue
+        size = f"  {stats['output_bytes'] / 1024:8.1f} kB" if stats.get("output_bytes") else ""
+        if "sources" in stats:
+            size += f"  ({stats['sources']} sources, {stats['source_bytes'] / 1024:.1f} kB data)"
+        if "parity" in stats:
+            size = "  parity ok" if stats["parity"] else "  PARITY MISMATCH"
+        print(f"{name:55s} {stats['seconds'] * 1000:9.2f} ms  peak {stats['peak_bytes'] / 1024:9.1f} kB{size}")
+
+    path = save_results(results, data_label)
+    print(f"\nResults written to {os.path.relpath(path, ROOT)}")
+    if args.compare:
+        compare(path)
+    # Ein Engine, das andere Frames als openpyxl liefert, lässt den Lauf scheitern
+    if any(stats.get("parity") is False for stats in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
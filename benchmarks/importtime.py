@@ -0,0 +1,135 @@
+"""
+Import time of the plot modules (python -X importtime).
+
+Run from the project root:
+
+    python benchmarks/importtime.py            # compare with benchmarks/importtime_baseline.json
+    python benchmarks/importtime.py --update   # write a new baseline
+
+Every module is imported in a fresh interpreter (like a new Streamlit or
+export worker), the cumulative import time is the median over --repeat runs.
+The script exits with status 1 if a module got slower than the baseline by
+more than --tolerance (wall times are noisy) or imports one of the heavy
+packages in WATCHED that it did not import before, so the startup time
+stays down. The baseline stores the Python version it was recorded with;
+import times of another Python version are not compared (record the
+baseline in the environment of environment.yml).
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "importtime_baseline.json")
+
+MODULES = [
+    "plots.dataset1_plots",
+    "plots.dataset2_plots",
+    "plots.dataset3_plots",
+    "utils",
+]
+# Heavy third-party packages that should not be pulled in by the plot modules
+WATCHED = ["matplotlib", "matplotlib.pyplot", "streamlit", "streamlit_bokeh", "openpyxl", "python_calamine"]
+
+PYTHON = sys.version.split()[0]
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module):
+    """
+    [(name, depth, cumulative_us)] of one `python -X importtime -c "import <module>"`.
+
+    Nested imports are listed before the module that imports them, with a
+    larger depth.
+    """
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "src"), MPLBACKEND="Agg")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    profile = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            profile.append((match.group(4), len(match.group(3)) // 2, int(match.group(2))))
+    return profile
+
+
+def direct_imports(profile, module):
+    """{name: cumulative_us} of the imports made by module itself (one level down)."""
+    names = [name for name, _, _ in profile]
+    end = names.index(module)
+    depth = profile[end][1]
+    children = {}
+    for name, child_depth, cumulative in reversed(profile[:end]):
+        if child_depth <= depth:
+            break
+        if child_depth == depth + 1:
+            children[name] = cumulative
+    return children
+
+
+def measure(module, repeat):
+    runs = [import_profile(module) for _ in range(repeat)]
+    cumulative = [next(us for name, _, us in run if name == module) for run in runs]
+    children = direct_imports(runs[0], module)
+    imported = {name for name, _, _ in runs[0]}
+    return {
+        "cumulative_ms": round(statistics.median(cumulative) / 1000, 1),
+        "imports": sorted(name for name in WATCHED if name in imported),
+        "slowest_direct_imports_ms": {
+            name: round(us / 1000, 1) for name, us in sorted(children.items(), key=lambda item: -item[1])[:8]
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown (0.5 = 50%%)")
+    parser.add_argument("--update", action="store_true", help="Write the result as the new baseline")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE) and not args.update:
+        with open(BASELINE, encoding="utf-8") as f:
+            stored = json.load(f)
+        # Importzeiten verschiedener Python-Versionen (Major.Minor) sind nicht vergleichbar
+        if stored["python"].split(".")[:2] != PYTHON.split(".")[:2]:
+            sys.exit(f"{os.path.relpath(BASELINE, ROOT)} was recorded with Python {stored['python']}, "
+                     f"this is Python {PYTHON}: compare with the same Python or write a new baseline with --update")
+        baseline = stored["modules"]
+
+    results = {module: measure(module, args.repeat) for module in MODULES}
+
+    regressions = []
+    for module, stats in results.items():
+        before = baseline.get(module)
+        line = f"{module:25s} {stats['cumulative_ms']:8.1f} ms"
+        if before:
+            ratio = stats["cumulative_ms"] / before["cumulative_ms"]
+            line += f"  (baseline {before['cumulative_ms']:.1f} ms, x{ratio:.2f})"
+            if ratio > 1 + args.tolerance:
+                regressions.append(module)
+                line += "  <-- slower"
+            new = set(stats["imports"]) - set(before["imports"])
+            if new:
+                regressions.append(module)
+                line += f"  <-- now imports {', '.join(sorted(new))}"
+        print(line)
+
+    if args.update:
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump({"python": PYTHON, "modules": results}, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {os.path.relpath(BASELINE, ROOT)}")
+    elif regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
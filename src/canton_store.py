@@ -0,0 +1,84 @@
+import pandas as pd
+
+from plots.prep import derived, normalised_mortality
+
+
+class CantonStore:
+    """
+    Dataset 2 in tidy long format: one value per (Parameter, Canton, Date).
+
+    The index is sorted, so lookups by parameter, canton and date range are
+    binary searches instead of full-frame scans. Parameters are lower case
+    ("deaths influenza", "deaths total", "cases influenza"); the population is
+    kept separately per (Canton, Year) for the per-100k rates.
+    """
+
+    def __init__(self, values, population):
+        self.values = values
+        self.population = population
+
+    @classmethod
+    def from_frames(cls, data_set2_mortality, data_set2_incidence_weekly, data_set2_population):
+        # Mortalität: bereits normalisiert (plots/prep.py), Monat -> Monatsanfang
+        deaths = normalised_mortality(data_set2_mortality)["Deaths"].reset_index()
+        deaths["Date"] = pd.to_datetime(dict(year=deaths["Year"], month=deaths["Month"], day=1))
+        deaths = deaths.rename(columns={"Deaths": "Value"})[["Parameter", "Canton", "Date", "Value"]]
+
+        # Wöchentliche Fälle: Beginn der Meldeperiode als Datum
+        weekly = data_set2_incidence_weekly
+        cantons = [c for c in weekly.columns if c not in ("StartReportingPeriod", "EndReportingPeriod", "Month", "Parameter")]
+        cases = weekly[["StartReportingPeriod", "Parameter"] + cantons].melt(
+            id_vars=["StartReportingPeriod", "Parameter"], var_name="Canton", value_name="Value"
+        )
+        cases["Parameter"] = cases["Parameter"].astype(str).str.strip().str.lower()
+        cases = cases.rename(columns={"StartReportingPeriod": "Date"})
+        cases["Date"] = pd.to_datetime(cases["Date"])
+
+        values = pd.concat([deaths.astype({"Parameter": str, "Canton": str}), cases], ignore_index=True)
+        values["Parameter"] = values["Parameter"].astype("category")
+        values["Canton"] = values["Canton"].astype("category")
+        values["Value"] = values["Value"].astype("float32")
+        values = values.set_index(["Parameter", "Canton", "Date"]).sort_index()["Value"]
+
+        population = data_set2_population.melt(id_vars="Year", var_name="Canton", value_name="Population")
+        population = population.dropna(subset=["Population"])
+        population["Canton"] = population["Canton"].astype("category")
+        population["Year"] = population["Year"].astype("int16")
+        population["Population"] = population["Population"].astype("int32")
+        population = population.set_index(["Canton", "Year"]).sort_index()["Population"]
+
+        return cls(values, population)
+
+    @property
+    def parameters(self):
+        return list(self.values.index.levels[0])
+
+    @property
+    def cantons(self):
+        return list(self.values.index.levels[1])
+
+    def query(self, parameter, canton, start=None, end=None):
+        """Values of one parameter and canton, optionally limited to [start, end], indexed by Date."""
+        series = self.values.loc[(parameter, canton)]
+        if start is not None or end is not None:
+            series = series.loc[slice(pd.Timestamp(start) if start else None, pd.Timestamp(end) if end else None)]
+        return series
+
+    def period(self, parameter, start, end):
+        """All cantons of one parameter in [start, end], indexed by (Canton, Date)."""
+        return self.values.loc[(parameter, slice(None), slice(pd.Timestamp(start), pd.Timestamp(end)))].droplevel("Parameter")
+
+    def population_of(self, canton, years):
+        return self.population.loc[canton].reindex(years).to_numpy()
+
+    def rate_per_100k(self, parameter, canton, start=None, end=None):
+        """Values per 100,000 inhabitants of the canton, using the population of the same year."""
+        series = self.query(parameter, canton, start, end)
+        population = self.population_of(canton, series.index.year.astype("int16"))
+        return (series / population * 100_000).rename(f"{parameter} per 100k")
+
+
+@derived
+def canton_store(data_set2_mortality, data_set2_incidence_weekly, data_set2_population):
+    """Builds the CantonStore once per data version."""
+    return CantonStore.from_frames(data_set2_mortality, data_set2_incidence_weekly, data_set2_population)
@@ -0,0 +1,72 @@
+import pandas as pd
+
+from excel_headers import column_letter
+from plots.prep import derived
+
+# Kuratierte Kennungen für data_set3_cleaned: Excel-Spalte -> (id, Beschriftung).
+# Die Zuordnung läuft über die Spaltenposition, nicht über den Kopfzeilentext.
+DATASET3_CURATED = {
+    "A": ("year", "Year"),
+    "B": ("infectious_total", "Infectious Diseases"),
+    "Y": ("respiratory_total", "Respiratory Diseases"),
+    "AE": ("neoplasms_total", "Neoplasms"),
+}
+
+INDEX_COLUMN = "Unnamed: 0"
+
+
+class ColumnCatalogue:
+    """
+    Maps the long multi-row headers of a sheet to short, stable column ids.
+
+    Every column gets an id: the curated one if its Excel column is listed,
+    otherwise "c_<letter>" (e.g. "c_ab"). The catalogue also keeps the long
+    header and a human-readable label per id.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self._by_header = {e["header"]: e["id"] for e in entries.values()}
+
+    @classmethod
+    def from_columns(cls, columns, curated=None):
+        curated = curated or {}
+        entries = {}
+        for i, header in enumerate(columns):
+            letter = column_letter(i)
+            col_id, label = curated.get(letter, (f"c_{letter.lower()}", header))
+            entries[col_id] = {"id": col_id, "letter": letter, "header": header, "label": label}
+        return cls(entries)
+
+    def ids(self):
+        return list(self.entries)
+
+    def id_for(self, header):
+        return self._by_header[header]
+
+    def header_for(self, col_id):
+        return self.entries[col_id]["header"]
+
+    def label_for(self, col_id):
+        return self.entries[col_id]["label"]
+
+    def rename(self, df):
+        """df with its columns renamed to the short ids."""
+        return df.rename(columns=self._by_header)
+
+    def to_frame(self):
+        return pd.DataFrame(list(self.entries.values())).set_index("id")
+
+
+@derived
+def dataset3_catalogue(data_set3_cleaned):
+    """Column catalogue of data_set3_cleaned (without the CSV index column)."""
+    columns = [c for c in data_set3_cleaned.columns if c != INDEX_COLUMN]
+    return ColumnCatalogue.from_columns(columns, DATASET3_CURATED)
+
+
+@derived
+def dataset3_with_ids(data_set3_cleaned):
+    """data_set3_cleaned with short column ids instead of the long headers."""
+    df = data_set3_cleaned.drop(columns=[INDEX_COLUMN], errors="ignore")
+    return dataset3_catalogue(data_set3_cleaned).rename(df)
@@ -0,0 +1,84 @@
+from excel_reader import read_excel
+
+
+def column_letter(index):
+    """Excel column letter for a 0-based column index (0 -> "A", 26 -> "AA")."""
+    letters = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(65 + rest) + letters
+    return letters
+
+
+def column_index(letter):
+    """0-based column index for an Excel column letter ("A" -> 0)."""
+    index = 0
+    for char in letter.upper():
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def combine_header_rows(header_rows, sep=" | "):
+    """
+    Combines multi-row headers into one label per column.
+
+    Each row is forward-filled to the right (merged cells), then the non-empty
+    parts of every column are joined top to bottom with sep. Vectorised: no
+    Python call per column.
+
+    Returns:
+        Series: column id (Excel letter) -> combined header.
+    """
+    filled = header_rows.ffill(axis=1)
+    parts = (filled.astype("string") + sep).fillna("")
+    combined = parts.sum(axis=0).str.slice(stop=-len(sep))
+    combined = combined.where(parts.ne("").any(axis=0), "")
+    combined.index = [column_letter(i) for i in range(len(combined))]
+    return combined.astype(object)
+
+
+def read_header_rows(file_path, first_row, n_rows, sheet_name=0):
+    """Reads only the header rows of a sheet (0-based rows, no data body)."""
+    return read_excel(file_path, sheet_name=sheet_name, header=None, skiprows=first_row, nrows=n_rows)
+
+
+def read_body(file_path, data_start, columns=None, sheet_name=0):
+    """
+    Reads the data body of a sheet from row data_start on.
+
+    Args:
+        columns (list): Column ids (Excel letters) to read; None reads all columns.
+
+    Returns:
+        DataFrame: object columns labelled with their ids.
+    """
+    usecols = None if columns is None else sorted(column_index(c) for c in columns)
+    # dtype=object: Zellen behalten ihren Excel-Typ (ganze Zahlen werden nicht wegen Lücken zu float)
+    body = read_excel(file_path, sheet_name=sheet_name, header=None, skiprows=data_start, usecols=usecols, dtype=object)
+    body.columns = [column_letter(i) for i in (usecols if usecols is not None else range(body.shape[1]))]
+    return body.reset_index(drop=True)
+
+
+def read_sheet_with_headers(file_path, header_first_row, header_n_rows, data_start, columns=None, sheet_name=0, sep=" | "):
+    """
+    Reads a sheet with a multi-row header in two cheap passes.
+
+    The header rows are read and combined first; then only the requested
+    columns of the body are read.
+
+    Args:
+        columns (list): Column ids (Excel letters) or combined header labels to keep.
+
+    Returns:
+        (DataFrame, dict): the data with combined headers, and the column id -> header mapping.
+    """
+    headers = combine_header_rows(read_header_rows(file_path, header_first_row, header_n_rows, sheet_name), sep)
+    if columns is not None:
+        by_label = {label: col_id for col_id, label in headers.items()}
+        columns = [c if c in headers.index else by_label[c] for c in columns]
+
+    body = read_body(file_path, data_start, columns, sheet_name)
+    mapping = {col_id: headers.get(col_id, "") for col_id in body.columns}
+    body.columns = [mapping[c] for c in body.columns]
+    return body, mapping
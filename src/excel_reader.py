@@ -0,0 +1,54 @@
+import importlib.util
+import logging
+import os
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Engines in order of preference; calamine (Rust) parses the Data/ workbooks
+# 5-15x faster than openpyxl and gives identical frames (benchmarks/bench.py --only excel)
+EXCEL_ENGINES = ("calamine", "openpyxl")
+_ENGINE_MODULES = {"calamine": "python_calamine", "openpyxl": "openpyxl"}
+
+# Aufrufe, mit denen src/ Excel liest: ganzes Blatt, Rohblatt ohne Kopf, Datenteil
+# als object (nur Datensatz 3 wird roh gelesen). Die Engines müssen bei allen gleich sein.
+EXCEL_CALLS = {
+    "sheet": {},
+    "raw": {"header": None},
+    "body": {"header": None, "skiprows": 8, "dtype": object},
+}
+
+
+def engine_available(engine):
+    return importlib.util.find_spec(_ENGINE_MODULES[engine]) is not None
+
+
+def available_engines():
+    return [engine for engine in EXCEL_ENGINES if engine_available(engine)]
+
+
+def excel_engine():
+    """The engine to use: PODSV_EXCEL_ENGINE if set and installed, else the fastest installed one."""
+    requested = os.environ.get("PODSV_EXCEL_ENGINE")
+    if requested in _ENGINE_MODULES and engine_available(requested):
+        return requested
+    engines = available_engines()
+    return engines[0] if engines else "openpyxl"
+
+
+def read_excel(path, engine=None, **kwargs):
+    """
+    pandas.read_excel with the fastest installed engine.
+
+    If the engine cannot read a workbook, it is read again with openpyxl
+    (the pandas default), so callers always get a frame if pandas can read it.
+    """
+    engine = engine or excel_engine()
+    try:
+        return pd.read_excel(path, engine=engine, **kwargs)
+    except Exception as e:
+        if engine == "openpyxl" or isinstance(e, OSError):
+            raise
+        logger.warning("%s: engine %s failed (%s), falling back to openpyxl", path, engine, e)
+        return pd.read_excel(path, engine="openpyxl", **kwargs)
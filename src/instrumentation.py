@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("podsv.metrics")
+
+# Stufen einer Skriptausführung, in der Reihenfolge der Pipeline
+STAGES = ("load", "prepare", "plot", "serialize", "savefig", "render")
+
+
+class Metrics:
+    """
+    Records wall time (and optionally allocations and payload bytes) per stage.
+
+    Stages are "load" (reading a dataset), "prepare" (cleaning CSVs), "plot"
+    (building a figure), "serialize" (a Bokeh figure to its JSON document),
+    "savefig" (rendering a Matplotlib figure to PNG) and "render" (handing a
+    figure to Streamlit). Every record is also written to the "podsv.metrics"
+    logger as one JSON line.
+
+    Timing is always on and cheap. With detailed=True allocations are traced
+    with tracemalloc and payload sizes are computed, which costs extra time.
+    """
+
+    def __init__(self, maxlen=2000, detailed=False):
+        self.detailed = detailed
+        self._records = deque(maxlen=maxlen)
+        self._runs = {}
+        self._current = threading.local()
+        self._lock = threading.Lock()
+
+    def start_run(self, session="main"):
+        """
+        Starts a new script run of session in the calling thread.
+
+        Every Streamlit session runs its script in its own thread, so the
+        records of concurrent sessions do not mix. Returns the run id
+        "<session>:<n>".
+        """
+        with self._lock:
+            self._runs[session] = self._runs.get(session, 0) + 1
+            run = f"{session}:{self._runs[session]}"
+        self.use_run(run)
+        return run
+
+    def use_run(self, run):
+        """Records made by the calling thread from now on belong to run (e.g. in a fragment rerun)."""
+        self._current.run = run
+
+    @property
+    def run_id(self):
+        """Run of the calling thread (None outside of a run)."""
+        return getattr(self._current, "run", None)
+
+    def set_detailed(self, detailed):
+        self.detailed = detailed
+        if detailed and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not detailed and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def measure(self, stage, name, payload=None):
+        """
+        Measures the block as one record.
+
+        Args:
+            payload (callable): returns the payload size in bytes; only called
+                in detailed mode.
+        """
+        tracing = self.detailed and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            record = {
+                "run": self.run_id,
+                "stage": stage,
+                "name": name,
+                "seconds": round(time.perf_counter() - start, 6),
+                "time": time.time(),
+            }
+            if tracing:
+                record["alloc_bytes"] = max(tracemalloc.get_traced_memory()[1] - before, 0)
+            if failed:
+                record["failed"] = True
+            elif self.detailed and payload is not None:
+                record["payload_bytes"] = payload()
+            self.record(record)
+
+    def record(self, record):
+        with self._lock:
+            self._records.append(record)
+        logger.info(json.dumps(record))
+
+    def records(self, run=None):
+        """All kept records, or those of one run (run=-1: the current run of the calling thread)."""
+        with self._lock:
+            records = list(self._records)
+        if run == -1:
+            run = self.run_id
+        return [r for r in records if run is None or r["run"] == run]
+
+    def summary(self, run=None):
+        """Total seconds (and bytes) per stage."""
+        totals = {}
+        for r in self.records(run):
+            total = totals.setdefault(r["stage"], {"count": 0, "seconds": 0.0, "alloc_bytes": 0, "payload_bytes": 0})
+            total["count"] += 1
+            total["seconds"] += r["seconds"]
+            total["alloc_bytes"] += r.get("alloc_bytes", 0)
+            total["payload_bytes"] += r.get("payload_bytes", 0)
+        return totals
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+
+metrics = Metrics()
+metrics.set_detailed(os.environ.get("PODSV_DEBUG") == "1")
+
+# PODSV_METRICS_LOG=<datei>: strukturiertes Log, eine JSON-Zeile pro Messung
+if os.environ.get("PODSV_METRICS_LOG"):
+    _handler = logging.FileHandler(os.environ["PODSV_METRICS_LOG"], encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+
+def measure(stage, name, payload=None):
+    return metrics.measure(stage, name, payload)
+
+
+def record_timing(stage, name, seconds):
+    """Records a duration that was measured elsewhere (e.g. in a worker process)."""
+    metrics.record({"run": metrics.run_id, "stage": stage, "name": name,
+                    "seconds": round(seconds, 6), "time": time.time()})
+
+
+# --- Metrics endpoint -------------------------------------------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics"):
+            # Der Server-Thread gehört zu keinem Lauf: Summe über alle gehaltenen Messungen
+            body = json.dumps({"summary": metrics.summary(), "records": metrics.records()}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port, host="127.0.0.1"):
+    """
+    Serves the records as JSON on http://host:port/metrics (once per process).
+
+    Streamlit has no own HTTP routes for this, so a small server thread is used.
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True, name="podsv-metrics").start()
+    return _server
@@ -1,30 +1,26 @@
 # plots/plot_pandemic_history.py
 
-import matplotlib.pyplot as plt
-import os 
-from bokeh.plotting import figure
-from bokeh.models import HoverTool, ColumnDataSource
-from bokeh.models import Title
-from bokeh.palettes import Category10
-from streamlit_bokeh import streamlit_bokeh
-import matplotlib.pyplot as plt
+# Matplotlib (pyplot) wird erst in den beiden Matplotlib-Plots importiert:
+# das spart beim Start jedes Workers fast eine Sekunde
 import numpy as np
-import pandas as pd
-from matplotlib.patches import Patch
-from bokeh.plotting import figure, output_notebook, show
-from bokeh.models import ColumnDataSource, Span
-from bokeh.io import push_notebook
-from bokeh.models.ranges import Range1d
-from bokeh.palettes import PuBu, BuPu
+from bokeh.plotting import figure
 from bokeh.models import (
-    ColumnDataSource, HoverTool, Span, Range1d, LinearAxis, Label, LabelSet,
+    HoverTool, Span, Range1d, LinearAxis,
     PanTool, BoxZoomTool, WheelZoomTool, ResetTool, CrosshairTool,
-    NumeralTickFormatter, Legend, Title, Select, RadioButtonGroup
+    NumeralTickFormatter,
 )
+from bokeh.palettes import PuBu, BuPu
+from plots.prep import covid_yearly_deaths
+from plots.export import export_figure
+from plots.sources import build_source
+from plots.downsample import downsampled_source
 
 
 
 def pandemic_death_rate_barplot(data_set1):
+    import matplotlib.pyplot as plt
+    from matplotlib.patches import Patch
+
     pandemic_years = [1889, 1918, 1957, 1968, 2009, 2020]  # Major pandemic years
     pandemic_data = data_set1[data_set1['Jahr'].isin(pandemic_years)].copy()
 
@@ -69,7 +65,6 @@ def pandemic_death_rate_barplot(data_set1):
                     ha='center', va='bottom')
 
    
-    from matplotlib.patches import Patch
     legend_elements = [
         Patch(facecolor=PuBu[6][1], alpha =0.8, label='Historical Pandemics'),
         Patch(facecolor=BuPu[7][2], alpha = 0.8, label='COVID-19')
@@ -79,9 +74,8 @@ def pandemic_death_rate_barplot(data_set1):
     # Adjust layout
     plt.tight_layout()
 
-    save_path = os.path.join(os.path.dirname(__file__), 'save_figures', 'pandemic_death_rate_barplot.png')
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    fig.savefig(save_path, dpi=300)
+    # Written to save_figures in the background (skipped if unchanged)
+    export_figure(fig, 'pandemic_death_rate_barplot')
 
     return fig
 
@@ -97,8 +91,7 @@ def plot_mortality_vs_population(data_set1):
     highlight_data = data_set1[data_set1['Jahr'].isin(pandemic_years)].copy()
 
 
-    source_main = ColumnDataSource(pandemic_data)
-    source_highlights = ColumnDataSource(highlight_data)
+    source_highlights = build_source(highlight_data, ['Jahr', 'Todesfälle_Grippe_100000'])
 
 
     p = figure(
@@ -110,6 +103,9 @@ def plot_mortality_vs_population(data_set1):
         tools=""  
     )
 
+    # Long series are downsampled (LTTB) and refined on zoom, see plots/downsample.py
+    source_main = downsampled_source(p, pandemic_data, 'Jahr', ['Population', 'Todesfälle_Grippe_100000'])
+
 
     p.yaxis.formatter = NumeralTickFormatter(format="0,0")
     p.y_range = Range1d(0, pandemic_data['Population'].max() * 1.1)
@@ -194,13 +190,10 @@ def plot_mortality_vs_population(data_set1):
 
 
 def plot_covid_death(data_covid):
-    # Filter for Switzerland
-    switzerland_data = data_covid[data_covid['location'] == 'Switzerland'].copy()
-    switzerland_data['date'] = pd.to_datetime(switzerland_data['date'])
-    switzerland_data['year'] = switzerland_data['date'].dt.year
+    import matplotlib.pyplot as plt
 
-    # Get end-of-year totals for new_deaths instead of total_cases
-    yearly_data = switzerland_data.groupby('year').agg({'new_deaths': 'max'}).reset_index()
+    # Yearly series for Switzerland (cached per data version, see plots/prep.py)
+    yearly_data = covid_yearly_deaths(data_covid, 'Switzerland')
 
     
     fig, ax = plt.subplots(figsize=(12, 7))
@@ -233,9 +226,8 @@ def plot_covid_death(data_covid):
     # Layout 
     plt.tight_layout()
    
-    save_path = os.path.join(os.path.dirname(__file__), 'save_figures', 'plot_covid_death.png')
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    fig.savefig(save_path, dpi=300)
+    # Written to save_figures in the background (skipped if unchanged)
+    export_figure(fig, 'plot_covid_death')
 
     return fig
 
@@ -261,10 +253,6 @@ def plot_excess_mortality(data_set1, pandemic_years=None):
     df_pos = df[df['Überasterblichkeit_Alles'] > 0]
     df_neg = df[df['Überasterblichkeit_Alles'] <= 0]
 
-    source_pos = ColumnDataSource(df_pos)
-    source_neg = ColumnDataSource(df_neg)
-
-
     # Create the figure
     p = figure(
         title="Excess Mortality in Switzerland (1880–2022)",
@@ -279,12 +267,17 @@ def plot_excess_mortality(data_set1, pandemic_years=None):
         ]
     )
 
+    # Long series are downsampled (LTTB) and refined on zoom, see plots/downsample.py
+    source_all = downsampled_source(p, df, 'Jahr', ['Überasterblichkeit_Alles'])
+    source_pos = downsampled_source(p, df_pos, 'Jahr', ['Überasterblichkeit_Alles'])
+    source_neg = downsampled_source(p, df_neg, 'Jahr', ['Überasterblichkeit_Alles'])
+
     # Line showing the trend
-    p.line('Jahr', 'Überasterblichkeit_Alles', source=df, line_width=3, color= PuBu[7][0], alpha= 0.7)
+    p.line('Jahr', 'Überasterblichkeit_Alles', source=source_all, line_width=3, color= PuBu[7][0], alpha= 0.7)
 
     # Colored points
     p.scatter(
-        'Jahr', 'Überasterblichkeit_Alles', source=df,
+        'Jahr', 'Überasterblichkeit_Alles', source=source_all,
         size=8, line_color='black', line_width=1
     )
 
@@ -2,68 +2,22 @@
 
 import pandas as pd
 from bokeh.plotting import figure
-from bokeh.models import ColumnDataSource, HoverTool, BoxAnnotation, Span, Label
-from bokeh.palettes import BuPu, PuBu
-from bokeh.models.formatters import DatetimeTickFormatter, NumeralTickFormatter
-from bokeh.plotting import figure
-from bokeh.models import ColumnDataSource, HoverTool, Legend
+from bokeh.models import ColumnDataSource, HoverTool, BoxAnnotation, Span, Label, Legend
 from bokeh.models.formatters import DatetimeTickFormatter, NumeralTickFormatter
-from bokeh.palettes import PuBu, BuPu
-import pandas as pd
+from bokeh.palettes import BuPu, PuBu
+from plots.prep import mortality_comparison, monthly_cases_and_deaths
+from plots.sources import build_source
+from plots.downsample import downsampled_source
 
 
 
 def plot_deaths_comparison(data_set2_mortality):
     
-    df = data_set2_mortality.copy()
-
-    
-    df["Parameter"] = df["Parameter"].astype(str).str.strip().str.lower()
-    df["Month"] = df["Month"].astype(str).str.strip().str.lower()
-
-    
-    df["Parameter"] = df["Parameter"].replace({
-        "deaths total": "deaths total",
-        "total deaths": "deaths total",
-        "total death": "deaths total"
-    })
-
-    
-    month_map = {
-        'january': 1, 'february': 2, 'march': 3, 'april': 4,
-        'may': 5, 'june': 6, 'july': 7, 'august': 8,
-        'september': 9, 'october': 10, 'november': 11, 'december': 12
-    }
-    df["Month"] = df["Month"].map(month_map)
-
-   
-    influenza_ch = df[df["Parameter"] == "deaths influenza"][["Year", "Month", "CH"]]
-    total_ch = df[df["Parameter"] == "deaths total"][["Year", "Month", "CH"]]
-
-    
-    comparison_df = influenza_ch.copy()
-    comparison_df = comparison_df.rename(columns={"CH": "Influenza_Deaths"})
-
-   
-    comparison_df = comparison_df.reset_index(drop=True)
-    total_ch = total_ch.reset_index(drop=True)
-    comparison_df["Total_Deaths"] = total_ch["CH"]
-
-    
-    comparison_df["Date"] = pd.to_datetime(dict(
-        year=comparison_df["Year"],
-        month=comparison_df["Month"],
-        day=1
-    ))
-
-   
-    comparison_df = comparison_df[
-        (comparison_df["Year"] < 1958) |
-        ((comparison_df["Year"] == 1958) & (comparison_df["Month"] <= 8))
-    ]
+    # Monthly influenza vs. total deaths (cached per data version, see plots/prep.py)
+    comparison_df = mortality_comparison(data_set2_mortality)
 
     
-    source = ColumnDataSource(comparison_df)
+    source = build_source(comparison_df, ["Date", "Influenza_Deaths", "Total_Deaths"])
 
     
     p = figure(
@@ -109,41 +63,9 @@ def plot_deaths_comparison(data_set2_mortality):
 
 def plot_influenza_share(data_set2_mortality):
 
-    df_mortality_2 = data_set2_mortality.copy()
-
-    # Normalize the parameter column
-    df_mortality_2["Parameter"] = df_mortality_2["Parameter"].str.strip().str.lower()
-    df_mortality_2["Parameter"] = df_mortality_2["Parameter"].replace({
-        "deaths total": "deaths total",
-        "total deaths": "deaths total",
-        "total death": "deaths total"
-    })
-
-    # Convert month names to numbers
-    month_map = {
-        'january': 1, 'february': 2, 'march': 3, 'april': 4,
-        'may': 5, 'june': 6, 'july': 7, 'august': 8,
-        'september': 9, 'october': 10, 'november': 11, 'december': 12
-    }
-    df_mortality_2["Month"] = df_mortality_2["Month"].astype(str).str.strip().str.lower().map(month_map)
-
-    # Extract influenza and total deaths for Switzerland (CH)
-    influenza_ch_2 = df_mortality_2[df_mortality_2["Parameter"] == "deaths influenza"][["Year", "Month", "CH"]]
-    total_ch_2 = df_mortality_2[df_mortality_2["Parameter"] == "deaths total"][["Year", "Month", "CH"]]
-
-    # Merge by year and month
-    comparison_df_2 = influenza_ch_2.copy()
-    comparison_df_2 = comparison_df_2.rename(columns={"CH": "Influenza_Deaths"})
-    comparison_df_2["Total_Deaths"] = total_ch_2["CH"].values
-
-    # Construct date column
-    comparison_df_2["Date"] = pd.to_datetime(dict(year=comparison_df_2["Year"], month=comparison_df_2["Month"], day=1))
-
-    # Keep only data until August 1958
-    comparison_df_2 = comparison_df_2[(comparison_df_2["Year"] < 1958) | ((comparison_df_2["Year"] == 1958) & (comparison_df_2["Month"] <= 8))]
-    # Calculate influenza share
-    comparison_df_2["Influenza_Share"] = comparison_df_2["Influenza_Deaths"] / comparison_df_2["Total_Deaths"] * 100
-    source = ColumnDataSource(comparison_df_2)
+    # Monthly influenza share (cached per data version, see plots/prep.py)
+    comparison_df_2 = mortality_comparison(data_set2_mortality)
+    source = build_source(comparison_df_2, ["Date", "Influenza_Share"])
 
     # Plot setup
     p = figure(title="Influenza Deaths as a Share of Total Deaths in Switzerland (1953–1958)",
@@ -241,19 +163,19 @@ def plot_weekly_cases(data_set2_incidence_weekly):
     weekly_ch = data_set2_incidence_weekly[data_set2_incidence_weekly["Parameter"] == "Cases Influenza"]
     weekly_ch = weekly_ch[["StartReportingPeriod", "CH"]].rename(columns={"StartReportingPeriod": "Date", "CH": "Weekly_Cases"})
     weekly_ch["Date"] = pd.to_datetime(weekly_ch["Date"])
-    weekly_ch["Week_Year"] = weekly_ch["Date"].dt.strftime("%d %b %Y")
-
-    source = ColumnDataSource(weekly_ch)
 
     p = figure(title="Weekly Influenza Cases in Switzerland (1956–1958)",
                x_axis_type="datetime", width=950, height=550,
                x_axis_label="Year", y_axis_label="Weekly Cases",
                tools="pan,wheel_zoom,box_zoom,reset,hover,save")
 
+    # Long series (e.g. daily reporting) are downsampled and refined on zoom, see plots/downsample.py
+    source = downsampled_source(p, weekly_ch, "Date", ["Weekly_Cases"])
+
     p.line(x='Date', y='Weekly_Cases', source=source, line_width=2.5, color=PuBu[7][0], alpha=0.7)
 
     hover = p.select_one(HoverTool)
-    hover.tooltips = [("Week", "@Week_Year"), ("Cases", "@Weekly_Cases{0,0}")]
+    hover.tooltips = [("Week", "@Date{%d %b %Y}"), ("Cases", "@Weekly_Cases{0,0}")]
     hover.formatters = {'@Date': 'datetime'}
 
     p.xaxis.formatter = DatetimeTickFormatter(years="%Y", months="%b %Y")
@@ -273,43 +195,9 @@ def plot_weekly_cases(data_set2_incidence_weekly):
 
 
 def plot_monthly_cases_and_deaths(data_set2_incidence_weekly, data_set2_mortality):
-    # --- Prepare monthly influenza cases ---
-    cases_df = data_set2_incidence_weekly.copy()
-    cases_df = cases_df[cases_df["Parameter"] == "Cases Influenza"]
-    cases_df["Date"] = pd.to_datetime(cases_df["StartReportingPeriod"])
-    cases_df["MonthStart"] = cases_df["Date"].values.astype("datetime64[M]")
-    monthly_cases = (
-        cases_df.groupby("MonthStart")["CH"]
-        .sum()
-        .reset_index()
-        .rename(columns={"MonthStart": "Date", "CH": "Monthly_Cases"})
-    )
-
-    # --- Prepare monthly influenza deaths ---
-    deaths_df = data_set2_mortality.copy()
-    deaths_df["Parameter"] = deaths_df["Parameter"].str.strip().str.lower()
-    deaths_df = deaths_df[deaths_df["Parameter"] == "deaths influenza"]
-    deaths_df["Month"] = pd.to_numeric(deaths_df["Month"], errors="coerce")
-    deaths_df["Date"] = pd.to_datetime(dict(year=deaths_df["Year"], month=deaths_df["Month"], day=1))
-    monthly_deaths = (
-        deaths_df.groupby("Date")["CH"]
-        .sum()
-        .reset_index()
-        .rename(columns={"CH": "Monthly_Deaths"})
-    )
-
-    # --- Filter to 1957–1958 ---
-    monthly_cases = monthly_cases[
-        (monthly_cases["Date"].dt.year >= 1957) & (monthly_cases["Date"].dt.year <= 1958)
-    ]
-    monthly_deaths = monthly_deaths[
-        (monthly_deaths["Date"].dt.year >= 1957) & (monthly_deaths["Date"].dt.year <= 1958)
-    ]
-
-    # --- Merge for plotting ---
-    merged = pd.merge(monthly_cases, monthly_deaths, on="Date", how="outer").fillna(0).sort_values("Date")
-    merged["Month_Year"] = merged["Date"].dt.strftime("%B %Y")
-    source = ColumnDataSource(merged)
+    # --- Monthly cases and deaths (cached per data version, see plots/prep.py) ---
+    merged = monthly_cases_and_deaths(data_set2_incidence_weekly, data_set2_mortality)
+    source = build_source(merged, ["Date", "Monthly_Cases", "Monthly_Deaths"])
 
     # --- Bokeh plot ---
     p = figure(title="Monthly Influenza Cases and Deaths in Switzerland (1957–1958)",
@@ -326,7 +214,7 @@ def plot_monthly_cases_and_deaths(data_set2_incidence_weekly, data_set2_mortalit
     # --- Hover formatting ---
     hover = p.select_one(HoverTool)
     hover.tooltips = [
-        ("Month", "@Month_Year"),
+        ("Month", "@Date{%B %Y}"),
         ("Monthly Cases", "@Monthly_Cases{0,0}"),
         ("Monthly Deaths", "@Monthly_Deaths{0,0}")
     ]
@@ -1,40 +1,31 @@
 import pandas as pd
 from bokeh.plotting import figure
-from bokeh.models import ColumnDataSource, Select, CustomJS,  HoverTool, RadioButtonGroup, CustomJS
+from bokeh.models import Select, CustomJS, HoverTool
 from bokeh.layouts import column, row
 from bokeh.transform import dodge
 from bokeh.palettes import PuBu, BuPu
-from bokeh.plotting import figure, show
-import streamlit as st
-import streamlit as st
-import streamlit.components.v1 as components
-from bokeh.embed import file_html
-from bokeh.resources import CDN
+from plots.sources import build_source
+from column_catalogue import dataset3_catalogue, dataset3_with_ids
+
+# Short ids of the three major causes in data_set3_cleaned
+MAJOR_CAUSES = ["infectious_total", "respiratory_total", "neoplasms_total"]
 
 def plot_major_causes_over_time(df):
-    df = df.copy()
-    df = df.loc[:, ~df.columns.duplicated()]
-    df['Year'] = pd.to_numeric(df['Jahr'], errors='coerce')
+    # Short column ids instead of the long German headers (see column_catalogue.py)
+    catalogue = dataset3_catalogue(df)
+    df = dataset3_with_ids(df).copy()
+    df['Year'] = pd.to_numeric(df['year'], errors='coerce')
 
     # Wähle Spalten
-    cols = [
-        "Infektions- und parasitäre Krankheiten | Pocken, Scharlach, Masern, Typhus, Diphtherie, Keuchhusten | Total",
-        "Atmungsorgane | Total | Aids",
-        "Neubildungen | Total | chitis"
-    ]
-
-    col_map = {
-        cols[0]: "Infectious Diseases",
-        cols[1]: "Respiratory Diseases",
-        cols[2]: "Neoplasms"
-    }
+    cols = MAJOR_CAUSES
+    col_map = {c: catalogue.label_for(c) for c in cols}
 
     df_subset = df[["Year"] + cols].dropna()
     for col in cols:
         df_subset[col] = pd.to_numeric(df_subset[col], errors='coerce')
     df_subset[cols] = df_subset[cols].clip(lower=0)
 
-    source = ColumnDataSource(df_subset)
+    source = build_source(df_subset, ["Year"] + cols)
 
     colors = (PuBu[6][1], PuBu[7][0], BuPu[7][2])
     renderers = {}
@@ -55,9 +46,9 @@ def plot_major_causes_over_time(df):
     hover = HoverTool(
         tooltips=[
             ("Year", "@Year"),
-            ("Respiratory Deaths", f"@{{{cols[1]}}}{{0,0}}"),
-            ("Infectious Deaths", f"@{{{cols[0]}}}{{0,0}}"),
-            ("Neoplasms Deaths", f"@{{{cols[2]}}}{{0,0}}")
+            ("Respiratory Deaths", f"@{cols[1]}{{0,0}}"),
+            ("Infectious Deaths", f"@{cols[0]}{{0,0}}"),
+            ("Neoplasms Deaths", f"@{cols[2]}{{0,0}}")
         ],
         renderers=[renderers["Respiratory Diseases"]],
         mode='vline'
@@ -78,21 +69,12 @@ def plot_major_causes_over_time(df):
 
 
 def plot_year_comparison_barplot(df):
-    df = df.copy()
-    df = df.loc[:, ~df.columns.duplicated()]
-    df['Year'] = pd.to_numeric(df['Jahr'], errors='coerce')
+    catalogue = dataset3_catalogue(df)
+    df = dataset3_with_ids(df).copy()
+    df['Year'] = pd.to_numeric(df['year'], errors='coerce')
 
-    cols = [
-        "Infektions- und parasitäre Krankheiten | Pocken, Scharlach, Masern, Typhus, Diphtherie, Keuchhusten | Total",
-        "Atmungsorgane | Total | Aids",
-        "Neubildungen | Total | chitis"
-    ]
-
-    col_map = {
-        cols[0]: "Infectious Diseases",
-        cols[1]: "Respiratory Diseases",
-        cols[2]: "Neoplasms"
-    }
+    cols = MAJOR_CAUSES
+    col_map = {c: catalogue.label_for(c) for c in cols}
 
     df = df.dropna(subset=["Year"] + cols)
     for col in cols:
@@ -114,7 +96,7 @@ def plot_year_comparison_barplot(df):
         })
 
     comparison_df = get_comparison(year_a, year_b)
-    source = ColumnDataSource(comparison_df)
+    source = build_source(comparison_df, ['Cause', 'Year A', 'Year B'])
 
     p = figure(y_range=comparison_df['Cause'], height=550, width=950,
                title=f"Causes of Death: {year_a} vs {year_b}",
@@ -136,25 +118,24 @@ def plot_year_comparison_barplot(df):
     select_a = Select(title="Select Year A", value=str(year_a), options=[str(y) for y in years])
     select_b = Select(title="Select Year B", value=str(year_b), options=[str(y) for y in years])
 
+    # Compact payload for the callback: only the three cause columns as typed
+    # arrays plus a year -> row map, instead of the whole frame
+    values = {c: df[c].to_numpy(dtype="float64") for c in cols}
+    year_rows = {}
+    for i, year in enumerate(df["Year"].astype(int)):
+        year_rows.setdefault(str(year), i)
+
     js_code = """
-        const ya = parseInt(select_a.value);
-        const yb = parseInt(select_b.value);
-
-        const causes = ["Infectious Diseases", "Respiratory Diseases", "Neoplasms"];
-        const cols = [
-            "Infektions- und parasitäre Krankheiten | Pocken, Scharlach, Masern, Typhus, Diphtherie, Keuchhusten | Total",
-            "Atmungsorgane | Total | Aids",
-            "Neubildungen | Total | chitis"
-        ];
-
-        const new_data = {Cause: causes, "Year A": [], "Year B": []};
-
-        for (let i = 0; i < cols.length; i++) {
-            let col = cols[i];
-            let index_a = df["Year"].indexOf(ya);
-            let index_b = df["Year"].indexOf(yb);
-            new_data["Year A"].push(df[col][index_a]);
-            new_data["Year B"].push(df[col][index_b]);
+        const ya = select_a.value;
+        const yb = select_b.value;
+        const index_a = year_rows[ya];
+        const index_b = year_rows[yb];
+
+        const new_data = {Cause: labels, "Year A": [], "Year B": []};
+
+        for (const col of cols) {
+            new_data["Year A"].push(values[col][index_a]);
+            new_data["Year B"].push(values[col][index_b]);
         }
 
         source.data = new_data;
@@ -164,7 +145,8 @@ def plot_year_comparison_barplot(df):
         source.change.emit();
     """
 
-    callback = CustomJS(args=dict(source=source, df=df.to_dict(orient='list'),
+    callback = CustomJS(args=dict(source=source, values=values, year_rows=year_rows,
+                                  cols=cols, labels=[col_map[c] for c in cols],
                                   select_a=select_a, select_b=select_b, p=p),
                         code=js_code)
 
@@ -174,7 +156,7 @@ def plot_year_comparison_barplot(df):
     return column(row(select_a, select_b), p)
 
 
-def plot_infectious_diseases(infectdata: pd.DataFrame):
+def plot_infectious_diseases(infectdata: pd.DataFrame, scale: str = "Linear"):
     infectious_cols = [
         "Smallpox", "Scarlet_Fever", "Measles",
         "Typhoid_Paratyphoid", "Diphtheria", "Whooping_Cough"
@@ -199,10 +181,9 @@ def plot_infectious_diseases(infectdata: pd.DataFrame):
     df_subset[infectious_cols] = df_subset[infectious_cols].clip(lower=0)
     df_subset['Total_Infectious'] = df_subset[infectious_cols].sum(axis=1)
 
-    source = ColumnDataSource(df_subset)
+    source = build_source(df_subset, ['Year'] + infectious_cols + ['Total_Infectious'])
     colors = [PuBu[7][0], BuPu[6][0], PuBu[7][3], PuBu[9][0], BuPu[5][2], BuPu[3][0]]
 
-    scale = st.radio("Y-Axis Scale", ["Linear", "Logarithmic"], index=0)
     y_axis_type = "linear" if scale == "Linear" else "log"
 
     p = figure(
@@ -0,0 +1,204 @@
+# plots/downsample.py
+
+import numpy as np
+from bokeh.models import CustomJS
+
+from plots.sources import build_source
+
+# Punkte pro Linie, die an den Browser gehen (pro y-Spalte)
+MAX_POINTS = 2000
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype("int64").astype("float64")
+    return values.astype("float64")
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points that keep the shape of y(x).
+
+    The first and last point are always kept; from every bucket in between the
+    point spanning the largest triangle with the previous pick and the mean of
+    the next bucket is taken, so peaks survive.
+    """
+    x, y = _as_float(x), _as_float(y)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def minmax_indices(y, n_out):
+    """Min/max decimation: the smallest and largest point of n_out / 2 equal buckets (vectorised)."""
+    y = _as_float(y)
+    n = len(y)
+    buckets = max(n_out // 2, 1)
+    if n_out >= n:
+        return np.arange(n)
+
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    # Leere (nur NaN) Blöcke liefern Index 0, werden unten abgeschnitten
+    filled_min = np.where(np.isnan(blocks), np.inf, blocks)
+    filled_max = np.where(np.isnan(blocks), -np.inf, blocks)
+    picked = np.concatenate([offsets + filled_min.argmin(axis=1), offsets + filled_max.argmax(axis=1), [0, n - 1]])
+    return np.unique(picked[picked < n])
+
+
+def select_indices(x, ys, n_out, method="lttb"):
+    """
+    Union of the selected points of every y column.
+
+    Points next to missing values are kept as well, so gaps stay gaps.
+    """
+    picked = [np.array([0, len(x) - 1])]
+    for y in ys:
+        y = _as_float(y)
+        finite = np.flatnonzero(~np.isnan(y))
+        if len(finite) == 0:
+            continue
+        if method == "minmax":
+            chosen = minmax_indices(y[finite], n_out)
+        else:
+            chosen = lttb_indices(np.asarray(x)[finite], y[finite], n_out)
+        picked.append(finite[chosen])
+        gaps = np.flatnonzero(np.diff(np.isnan(y)))
+        picked.append(np.concatenate([gaps, gaps + 1]))
+    return np.unique(np.concatenate(picked))
+
+
+# Gleiche Auswahl im Browser für den sichtbaren Ausschnitt (Zoom/Pan)
+_JS_SELECT = """
+function lttb(xs, ys, idx, n_out) {
+    const n = idx.length;
+    if (n_out >= n || n_out < 3) return idx;
+    const out = [idx[0]];
+    const bucket = (n - 2) / (n_out - 2);
+    let a = 0;
+    for (let i = 0; i < n_out - 2; i++) {
+        const start = Math.floor(i * bucket) + 1;
+        const end = Math.floor((i + 1) * bucket) + 1;
+        const next_end = Math.min(Math.floor((i + 2) * bucket) + 1, n);
+        let avg_x = 0, avg_y = 0;
+        for (let j = end; j < next_end; j++) { avg_x += xs[idx[j]]; avg_y += ys[idx[j]]; }
+        const count = Math.max(next_end - end, 1);
+        avg_x /= count; avg_y /= count;
+        const ax = xs[idx[a]], ay = ys[idx[a]];
+        let best = start, best_area = -1;
+        for (let j = start; j < end; j++) {
+            const area = Math.abs((ax - avg_x) * (ys[idx[j]] - ay) - (ax - xs[idx[j]]) * (avg_y - ay));
+            if (area > best_area) { best_area = area; best = j; }
+        }
+        out.push(idx[best]);
+        a = best;
+    }
+    out.push(idx[n - 1]);
+    return out;
+}
+
+function minmax(ys, idx, n_out) {
+    const n = idx.length;
+    if (n_out >= n) return idx;
+    const buckets = Math.max(Math.floor(n_out / 2), 1);
+    const size = Math.ceil(n / buckets);
+    const out = [idx[0], idx[n - 1]];
+    for (let b = 0; b * size < n; b++) {
+        let lo = -1, hi = -1;
+        for (let j = b * size; j < Math.min((b + 1) * size, n); j++) {
+            const v = ys[idx[j]];
+            if (lo < 0 || v < ys[idx[lo]]) lo = j;
+            if (hi < 0 || v > ys[idx[hi]]) hi = j;
+        }
+        out.push(idx[lo], idx[hi]);
+    }
+    return out;
+}
+
+const xs = full.data[x];
+const n = xs.length;
+const x_start = Math.min(x_range.start, x_range.end);
+const x_end = Math.max(x_range.start, x_range.end);
+
+// Sichtbares Fenster (x ist sortiert) plus je ein Punkt links und rechts
+let lo = 0, hi = n;
+while (lo < hi) { const mid = (lo + hi) >> 1; if (xs[mid] < x_start) lo = mid + 1; else hi = mid; }
+const first = Math.max(lo - 1, 0);
+lo = first; hi = n;
+while (lo < hi) { const mid = (lo + hi) >> 1; if (xs[mid] <= x_end) lo = mid + 1; else hi = mid; }
+const last = Math.min(lo, n - 1);
+
+const keep = new Set([first, last]);
+for (const y of ys) {
+    const values = full.data[y];
+    const finite = [];
+    for (let i = first; i <= last; i++) {
+        if (!Number.isNaN(values[i])) finite.push(i);
+        // Lücken erhalten
+        if (i < last && Number.isNaN(values[i]) !== Number.isNaN(values[i + 1])) { keep.add(i); keep.add(i + 1); }
+    }
+    const chosen = method === "minmax" ? minmax(values, finite, n_out) : lttb(xs, values, finite, n_out);
+    for (const i of chosen) keep.add(i);
+}
+const rows = Array.from(keep).sort((a, b) => a - b);
+
+const data = {};
+for (const col of Object.keys(full.data)) {
+    const column = full.data[col];
+    const picked = ArrayBuffer.isView(column) ? new column.constructor(rows.length) : new Array(rows.length);
+    rows.forEach((r, k) => { picked[k] = column[r]; });
+    data[col] = picked;
+}
+source.data = data;
+"""
+
+
+def downsampled_source(plot, df, x, ys, extra=(), max_points=MAX_POINTS, method="lttb"):
+    """
+    ColumnDataSource for long series: at most about max_points points per y column.
+
+    Short frames (<= max_points rows) are returned as build_source(df, ...).
+    Otherwise the source holds the selection (LTTB or min/max) of the whole
+    series, and the full columns are sent once in a second source that is
+    not rendered. A CustomJS on plot.x_range re-selects from the full data
+    of the visible window, so zooming in shows the detail again while the
+    browser never draws more than the bounded number of points.
+
+    Args:
+        plot: Bokeh figure whose x_range drives the selection.
+        extra (list): further columns (tooltips), taken from the same rows.
+    """
+    columns = [x] + list(ys) + [c for c in extra if c not in ys and c != x]
+    df = df.sort_values(x)
+    if len(df) <= max_points:
+        return build_source(df, columns)
+
+    rows = select_indices(df[x].to_numpy(), [df[y].to_numpy() for y in ys], max_points, method)
+    source = build_source(df.iloc[rows], columns)
+    full = build_source(df, columns)
+
+    callback = CustomJS(
+        args=dict(source=source, full=full, x_range=plot.x_range, x=x, ys=list(ys), n_out=max_points, method=method),
+        code=_JS_SELECT,
+    )
+    plot.x_range.js_on_change("start", callback)
+    plot.x_range.js_on_change("end", callback)
+    return source
+
@@ -0,0 +1,123 @@
+# plots/export.py
+
+import hashlib
+import io
+import os
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SAVE_DIR = os.path.join(os.path.dirname(__file__), 'save_figures')
+
+
+def _sha256_file(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _pickle_without_pyplot(fig):
+    """
+    Pickles fig so that the copy is not registered with pyplot when it is loaded.
+
+    A pickled pyplot figure carries _restore_to_pylab; pickle.loads would then
+    add the copy to pyplot's figure manager and make it the current figure,
+    on the export thread, while the script thread uses plt.gcf()/tight_layout().
+    """
+    from matplotlib.figure import Figure
+
+    class Pickler(pickle.Pickler):
+        def reducer_override(self, obj):
+            if not isinstance(obj, Figure):
+                return NotImplemented
+            func, args, state, *rest = obj.__reduce_ex__(pickle.DEFAULT_PROTOCOL)
+            state = {k: v for k, v in state.items() if k != "_restore_to_pylab"}
+            return (func, args, state, *rest)
+
+    buffer = io.BytesIO()
+    Pickler(buffer, protocol=pickle.DEFAULT_PROTOCOL).dump(fig)
+    return buffer.getvalue()
+
+
+class FigureExporter:
+    """
+    Writes Matplotlib figures to disk on a background thread pool.
+
+    submit() only pickles the figure, so the caller can keep using (or close)
+    it while the copy is encoded in the background. A file is only replaced
+    when its content changed, and always atomically (tmp file + os.replace).
+    """
+
+    def __init__(self, directory=SAVE_DIR, formats=("png",), dpi=300, max_workers=2):
+        self.directory = directory
+        self.formats = tuple(formats)
+        self.dpi = dpi
+        self.written = 0
+        self.skipped = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="figure-export")
+        self._hashes = {}
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def configure(self, formats=None, dpi=None, directory=None):
+        if formats is not None:
+            self.formats = tuple(formats)
+        if dpi is not None:
+            self.dpi = dpi
+        if directory is not None:
+            self.directory = directory
+
+    def submit(self, fig, name):
+        """Schedules fig to be written as <directory>/<name>.<format> for every configured format."""
+        payload = _pickle_without_pyplot(fig)
+        jobs = [(os.path.join(self.directory, f"{name}.{fmt}"), fmt, self.dpi) for fmt in self.formats]
+        future = self._executor.submit(self._write, payload, jobs)
+        with self._lock:
+            self._pending = [f for f in self._pending if not f.done()] + [future]
+        return future
+
+    def wait(self):
+        """Blocks until all submitted figures are written (e.g. before a static export)."""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.result()
+
+    def _write(self, payload, jobs):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        # Ohne pyplot rendern: die Kopie gehört keinem Figure-Manager
+        fig = pickle.loads(payload)
+        FigureCanvasAgg(fig)
+        for path, fmt, dpi in jobs:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, dpi=dpi)
+            content = buffer.getvalue()
+            digest = hashlib.sha256(content).hexdigest()
+
+            with self._lock:
+                known = self._hashes.get(path)
+            if known is None:
+                known = _sha256_file(path)
+            if known == digest:
+                with self._lock:
+                    self._hashes[path] = digest
+                    self.skipped += 1
+                continue
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._hashes[path] = digest
+                self.written += 1
+
+
+figure_exporter = FigureExporter()
+
+
+def export_figure(fig, name):
+    return figure_exporter.submit(fig, name)
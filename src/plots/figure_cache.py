@@ -0,0 +1,118 @@
+# plots/figure_cache.py
+
+import io
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from bokeh.model import Model
+
+from instrumentation import measure
+from plots.prep import data_version
+
+
+def _param_key(value):
+    # Nur das gecachte Frame selbst hat eine Quellversion, Ausschnitte davon werden gehasht
+    if isinstance(value, pd.DataFrame):
+        return ("frame", data_version(value))
+    if isinstance(value, (list, set)):
+        return tuple(_param_key(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _param_key(v)) for k, v in value.items()))
+    return value
+
+
+def figure_key(plot_func, args, kwargs):
+    """Content-addressed key: plot function, data version of every frame, remaining parameters."""
+    name = f"{plot_func.__module__}.{plot_func.__qualname__}"
+    return (
+        name,
+        tuple(_param_key(a) for a in args),
+        tuple(sorted((k, _param_key(v)) for k, v in kwargs.items())),
+    )
+
+
+def render_png(fig, dpi=100):
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+class FigureCache:
+    """
+    LRU cache for the output of the plot functions.
+
+    Bokeh models are serialised once with json_item and only the JSON is
+    kept; Matplotlib figures are rendered once to PNG bytes and closed. The
+    cache is shared by all sessions, so it never hands out a model (Bokeh
+    models belong to exactly one document). The plotting code only runs on
+    a miss. Plot functions must not create Streamlit widgets; choices like
+    the y-axis scale are passed in as parameters.
+    """
+
+    def __init__(self, maxsize=32, png_dpi=100):
+        self.maxsize = maxsize
+        self.png_dpi = png_dpi
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, plot_func, args, kwargs):
+        key = figure_key(plot_func, args, kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        with measure("plot", plot_func.__name__):
+            result = plot_func(*args, **kwargs)
+        # Das Modell gehört nur diesem Thread: hier serialisieren und dann verwerfen
+        if isinstance(result, Model):
+            from bokeh.embed import json_item
+
+            with measure("serialize", plot_func.__name__, payload=lambda: len(document)):
+                document = json.dumps(json_item(result))
+            entry = {"json": document}
+        else:
+            with measure("savefig", plot_func.__name__, payload=lambda: len(png)):
+                png = render_png(result, self.png_dpi)
+            entry = {"png": png}
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get_png(self, plot_func, *args, **kwargs):
+        """Returns the PNG bytes of a Matplotlib plot function."""
+        entry = self._entry(plot_func, args, kwargs)
+        if "png" not in entry:
+            raise TypeError(f"{plot_func.__name__} returns a Bokeh model, use get_json")
+        return entry["png"]
+
+    def get_json(self, plot_func, *args, **kwargs):
+        """Returns the serialised Bokeh document (json.dumps of bokeh.embed.json_item) of a Bokeh plot function."""
+        entry = self._entry(plot_func, args, kwargs)
+        if "json" not in entry:
+            raise TypeError(f"{plot_func.__name__} returns a Matplotlib figure, use get_png")
+        return entry["json"]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "maxsize": self.maxsize}
+
+
+figure_cache = FigureCache()
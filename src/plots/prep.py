@@ -0,0 +1,188 @@
+# plots/prep.py
+
+import functools
+import weakref
+
+import pandas as pd
+
+# id(frame) -> (weakref, Version) der Frames aus utils.cached_read. Nach Identität,
+# nicht über df.attrs: pandas kopiert attrs auf jeden Ausschnitt und jede Kopie.
+_versions = {}
+
+
+def set_data_version(df, version):
+    """Registers the source version of exactly this frame object (not of its slices or copies)."""
+    frame_id = id(df)
+    _versions[frame_id] = (weakref.ref(df, lambda _: _versions.pop(frame_id, None)), version)
+
+
+def data_version(df):
+    """
+    Returns a token that changes whenever the content of the frame changes.
+
+    Frames loaded through utils.cached_read are registered with their source
+    version (set_data_version); for all other frames, including slices and
+    copies of the cached ones, the content is hashed.
+    """
+    entry = _versions.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    return str(pd.util.hash_pandas_object(df, index=True).sum())
+
+
+class DerivedCache:
+    """
+    Keeps one plot-ready table per prep function and data version.
+
+    An entry is rebuilt when the version of one of its input frames changes or
+    after invalidate(). The cached tables are shared, plot functions must not
+    modify them.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name, key, builder):
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = builder()
+        self._entries[name] = (key, value)
+        return value
+
+    def invalidate(self, name=None):
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+derived_cache = DerivedCache()
+
+
+def derived(func):
+    """Caches the result of a prep function per data version of its DataFrame arguments."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = tuple(data_version(a) if isinstance(a, pd.DataFrame) else a for a in args)
+        key += tuple(sorted(kwargs.items()))
+        return derived_cache.get(func.__name__, key, lambda: func(*args, **kwargs))
+    return wrapper
+
+
+@derived
+def covid_yearly_deaths(data_covid, location="Switzerland"):
+    switzerland_data = data_covid[data_covid['location'] == location].copy()
+    switzerland_data['date'] = pd.to_datetime(switzerland_data['date'])
+    switzerland_data['year'] = switzerland_data['date'].dt.year
+
+    # Get end-of-year totals for new_deaths instead of total_cases
+    return switzerland_data.groupby('year').agg({'new_deaths': 'max'}).reset_index()
+
+
+MONTHS = [
+    'january', 'february', 'march', 'april', 'may', 'june',
+    'july', 'august', 'september', 'october', 'november', 'december'
+]
+
+PARAMETER_ALIASES = {
+    "total deaths": "deaths total",
+    "total death": "deaths total",
+}
+
+
+def _month_numbers(month):
+    # Monatsnamen über eine Kategorie in Zahlen umwandeln, Zahlen bleiben Zahlen
+    names = pd.Categorical(month.astype(str).str.strip().str.lower(), categories=MONTHS)
+    numbers = pd.Series(names.codes + 1, index=month.index).where(names.codes >= 0)
+    return numbers.fillna(pd.to_numeric(month, errors="coerce"))
+
+
+@derived
+def normalised_mortality(data_set2_mortality):
+    """
+    Dataset 2 mortality in long format, normalised once per data version.
+
+    Index: (Parameter, Canton, Year, Month), Parameter and Canton as categoricals;
+    one column "Deaths".
+    """
+    df = data_set2_mortality
+    cantons = [c for c in df.columns if c not in ("Month", "Year", "Parameter")]
+
+    parameter = df["Parameter"].astype(str).str.strip().str.lower().replace(PARAMETER_ALIASES)
+    # In einem Schritt zusammensetzen (spaltenweises Einfügen fragmentiert den Frame)
+    wide = pd.concat([
+        pd.DataFrame({
+            "Parameter": parameter.astype("category"),
+            "Year": df["Year"].astype("int16"),
+            "Month": _month_numbers(df["Month"]).astype("int8"),
+        }),
+        df[cantons].astype("float32"),
+    ], axis=1)
+
+    long = wide.melt(id_vars=["Parameter", "Year", "Month"], var_name="Canton", value_name="Deaths")
+    long["Canton"] = pd.Categorical(long["Canton"], categories=cantons)
+    return long.set_index(["Parameter", "Canton", "Year", "Month"]).sort_index()
+
+
+def mortality_by_parameter(data_set2_mortality, canton="CH"):
+    """Deaths per parameter for one canton, one column per parameter, indexed by (Year, Month)."""
+    deaths = normalised_mortality(data_set2_mortality)["Deaths"]
+    return deaths.xs(canton, level="Canton").unstack("Parameter")
+
+
+@derived
+def mortality_comparison(data_set2_mortality, canton="CH"):
+    """Monthly influenza and total deaths (Jan 1953 - Aug 1958) with the influenza share."""
+    # Join über den (Year, Month)-Index statt über die Zeilenposition
+    by_parameter = mortality_by_parameter(data_set2_mortality, canton)
+    comparison_df = by_parameter[["deaths influenza", "deaths total"]].dropna(how="all")
+    comparison_df.columns = ["Influenza_Deaths", "Total_Deaths"]
+    comparison_df = comparison_df.reset_index()
+
+    comparison_df["Date"] = pd.to_datetime(dict(
+        year=comparison_df["Year"],
+        month=comparison_df["Month"],
+        day=1
+    ))
+
+    # Keep only data until August 1958
+    comparison_df = comparison_df[comparison_df["Date"] <= pd.Timestamp("1958-08-01")].reset_index(drop=True)
+    comparison_df["Influenza_Share"] = comparison_df["Influenza_Deaths"] / comparison_df["Total_Deaths"] * 100
+    return comparison_df
+
+
+@derived
+def monthly_cases_and_deaths(data_set2_incidence_weekly, data_set2_mortality, canton="CH"):
+    # --- Prepare monthly influenza cases ---
+    cases_df = data_set2_incidence_weekly[data_set2_incidence_weekly["Parameter"] == "Cases Influenza"]
+    monthly_cases = (
+        cases_df.groupby(pd.to_datetime(cases_df["StartReportingPeriod"]).values.astype("datetime64[M]"))[canton]
+        .sum()
+        .rename_axis("Date")
+        .reset_index()
+        .rename(columns={canton: "Monthly_Cases"})
+    )
+
+    # --- Monthly influenza deaths from the normalised mortality data ---
+    deaths = mortality_by_parameter(data_set2_mortality, canton)["deaths influenza"].dropna().reset_index()
+    monthly_deaths = pd.DataFrame({
+        "Date": pd.to_datetime(dict(year=deaths["Year"], month=deaths["Month"], day=1)),
+        "Monthly_Deaths": deaths["deaths influenza"],
+    })
+
+    # --- Filter to 1957–1958 ---
+    monthly_cases = monthly_cases[monthly_cases["Date"].dt.year.between(1957, 1958)]
+    monthly_deaths = monthly_deaths[monthly_deaths["Date"].dt.year.between(1957, 1958)]
+
+    # --- Merge for plotting ---
+    merged = pd.merge(monthly_cases, monthly_deaths, on="Date", how="outer").fillna(0).sort_values("Date")
+    merged["Month_Year"] = merged["Date"].dt.strftime("%B %Y")
+    return merged.reset_index(drop=True)
@@ -0,0 +1,72 @@
+# plots/sources.py
+
+import json
+
+import numpy as np
+import pandas as pd
+from bokeh.models import ColumnDataSource
+
+_INT32 = np.iinfo(np.int32)
+
+
+def compact_column(series):
+    """
+    Converts a column into an array Bokeh can send with its binary encoding.
+
+    Dates stay datetime64, integers become int32 (if they fit), all other
+    numbers float32. Text columns are only kept as lists of strings.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.to_numpy(dtype="datetime64[ns]")
+    if pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=bool)
+    if pd.api.types.is_integer_dtype(series) and not series.isna().any():
+        if series.empty or (series.min() >= _INT32.min and series.max() <= _INT32.max):
+            return series.to_numpy(dtype="int32")
+        return series.to_numpy(dtype="float64")
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype="float32", na_value=np.nan)
+
+    numeric = pd.to_numeric(series, errors="coerce")
+    if numeric.notna().sum() == series.notna().sum():
+        return numeric.to_numpy(dtype="float32", na_value=np.nan)
+    return series.astype(str).tolist()
+
+
+def build_source(df, columns):
+    """ColumnDataSource with only the given columns of df, as compact typed arrays."""
+    return ColumnDataSource(data={col: compact_column(df[col]) for col in columns})
+
+
+def source_nbytes(source):
+    """Approximate raw size of the columns of a ColumnDataSource."""
+    total = 0
+    for values in source.data.values():
+        if isinstance(values, np.ndarray):
+            total += values.nbytes
+        else:
+            total += len(json.dumps(list(values), default=str))
+    return total
+
+
+def figure_payload_bytes(model):
+    """Size of the serialised Bokeh document (as sent by streamlit_bokeh) in bytes."""
+    from bokeh.embed import json_item
+
+    return len(json.dumps(json_item(model)))
+
+
+def payload_report(model):
+    """
+    Payload size of a Bokeh figure.
+
+    Returns:
+        dict: {"payload_bytes": serialised document, "sources": number of
+        ColumnDataSources, "source_bytes": raw size of their columns}
+    """
+    sources = list(model.select({"type": ColumnDataSource}))
+    return {
+        "payload_bytes": figure_payload_bytes(model),
+        "sources": len(sources),
+        "source_bytes": sum(source_nbytes(s) for s in sources),
+    }
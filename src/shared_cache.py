@@ -0,0 +1,91 @@
+import functools
+import glob
+import hashlib
+import os
+import re
+import tempfile
+
+from snapshots import FileLock, from_typed_frame, to_typed_frame
+
+# Format der Arrow-Dateien: erhöhen, wenn sich _publish_frame ändert
+SHARED_FORMAT = 2
+
+
+def default_shared_dir():
+    """/dev/shm (RAM) if available, otherwise a directory in the system temp dir."""
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm/podsv_cache"
+    return os.path.join(tempfile.gettempdir(), "podsv_cache")
+
+
+def _entry_name(path, reader_name):
+    stat = os.stat(path)
+    stem = re.sub(r"[^A-Za-z0-9_-]+", "_", os.path.splitext(os.path.basename(path))[0])
+    version = hashlib.sha1(
+        f"{os.path.abspath(path)}:{reader_name}:{stat.st_mtime_ns}:{stat.st_size}:{SHARED_FORMAT}".encode()
+    ).hexdigest()[:16]
+    return f"{stem}.{reader_name}", version
+
+
+def _map_frame(arrow_path):
+    import pyarrow as pa
+
+    # Memory-mapped: numerische Spalten ohne Lücken werden nicht kopiert
+    source = pa.memory_map(arrow_path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    return from_typed_frame(table.to_pandas(split_blocks=True))
+
+
+def _publish_frame(df, arrow_path):
+    import pyarrow as pa
+
+    # Reine Textspalten (str und NaN) als Text ablegen: to_typed_frame würde aus
+    # "1876" eine Zahl machen, _map_frame gibt sie wieder als object zurück
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object and df[col].dropna().map(type).eq(str).all():
+            df[col] = df[col].astype("string")
+    table = pa.Table.from_pandas(to_typed_frame(df))
+    tmp_path = f"{arrow_path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, arrow_path)
+
+
+def read_shared(path, reader, directory=None):
+    """
+    Reads path through a shared Arrow IPC file that all worker processes map.
+
+    The first process that needs a source version reads it with reader and
+    publishes it as <directory>/<name>.<version>.arrow (under a file lock, so
+    only one process parses). All other processes memory-map that file.
+    Versions of a source that are out of date are removed.
+    """
+    directory = directory or default_shared_dir()
+    os.makedirs(directory, exist_ok=True)
+    name, version = _entry_name(path, reader.__name__)
+    arrow_path = os.path.join(directory, f"{name}.{version}.arrow")
+
+    if not os.path.exists(arrow_path):
+        with FileLock(os.path.join(directory, f"{name}.lock")):
+            if not os.path.exists(arrow_path):
+                _publish_frame(reader(path), arrow_path)
+                for old in glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(name)}.*.arrow")):
+                    if old != arrow_path:
+                        os.remove(old)
+    return _map_frame(arrow_path)
+
+
+def shared_reader(reader, directory=None):
+    """Wraps reader so cached_read / LazyDataRegistry go through the shared cache."""
+    # partial statt Closure: lässt sich an Worker-Prozesse übergeben (paralleles Laden)
+    read = functools.partial(read_shared, reader=reader, directory=directory)
+    read.__name__ = f"shared_{reader.__name__}"
+    return read
+
+
+def clear_shared(directory=None):
+    directory = directory or default_shared_dir()
+    for path in glob.glob(os.path.join(glob.escape(directory), "*.arrow")):
+        os.remove(path)
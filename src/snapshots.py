@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from excel_reader import read_excel
+
+try:
+    import fcntl
+except ImportError:  # Windows: keine Sperre, jeder Prozess schreibt notfalls selbst
+    fcntl = None
+
+# Excel-Quellen, die als Parquet-Snapshot abgelegt werden
+WORKBOOKS = {
+    "data_set1": "1_History_Pandemics.xlsx",
+    "data_set2_mortality": "2_All_cantons_1953-1958_Mortality.xlsx",
+    "data_set2_incidence_weekly": "2_Data_cantons_incidence_weekly_56_58_NEW.xlsx",
+    "data_set2_population": "2_Population_cantons.xlsx",
+    "data_set3": "3_Todesursachen Schweiz ohne Alter 1876-2002.xlsx",
+}
+
+SNAPSHOT_DIR = "snapshots"
+MANIFEST_NAME = "manifest.json"
+
+# Format der Snapshots: erhöhen, wenn sich to_typed_frame oder das Schreiben
+# ändert, damit bestehende Snapshots neu gebaut werden (wie CLEANING_VERSIONS)
+SNAPSHOT_VERSION = 1
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileLock:
+    """Exclusive lock on a lock file (fcntl), shared by all processes on the machine."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "a+")
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+def _snapshot_dir(base_path):
+    return os.path.join(base_path, SNAPSHOT_DIR)
+
+
+def _snapshot_path(base_path, workbook):
+    name = os.path.splitext(workbook)[0]
+    return os.path.join(_snapshot_dir(base_path), f"{name}.parquet")
+
+
+def load_manifest(base_path="Data"):
+    path = os.path.join(_snapshot_dir(base_path), MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(base_path, manifest):
+    path = os.path.join(_snapshot_dir(base_path), MANIFEST_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def to_typed_frame(df):
+    """
+    Gives every column a single Arrow-compatible dtype.
+
+    Object columns that are fully numeric become numbers; mixed columns (e.g. the
+    "..." placeholders in the Todesursachen sheet) are stored as strings.
+    Column labels are stored as strings, because Parquet requires it.
+    """
+    df = df.copy()
+    df.columns = [str(c) for c in df.columns]
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        numeric = pd.to_numeric(df[col], errors="coerce")
+        if numeric.notna().sum() == df[col].notna().sum():
+            df[col] = numeric
+        else:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str)).astype("string")
+    return df
+
+
+def snapshot_versions():
+    """Format and library versions a snapshot depends on; a snapshot with other versions is rebuilt."""
+    import pyarrow
+
+    return {"snapshot_version": SNAPSHOT_VERSION, "pandas": pd.__version__, "pyarrow": pyarrow.__version__}
+
+
+def from_typed_frame(df):
+    """
+    Turns the string columns of a typed frame back into object columns.
+
+    read_excel and read_csv give text as object columns with NaN for missing
+    cells; frames read from a snapshot or the shared cache look the same.
+    """
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.StringDtype):
+            df[col] = df[col].astype(object).where(df[col].notna(), np.nan)
+    return df
+
+
+def _entry_is_fresh(entry, source_path, snapshot_path):
+    if entry is None or not os.path.exists(snapshot_path):
+        return False
+    # Von einer anderen pandas/pyarrow-Version oder älterem Code geschrieben
+    # (z.B. andere Zeitauflösung der Datumsspalten)
+    if any(entry.get(key) != value for key, value in snapshot_versions().items()):
+        return False
+    mtime_ns, size = os.stat(source_path).st_mtime_ns, os.path.getsize(source_path)
+    if entry.get("mtime_ns") == mtime_ns and entry.get("size") == size:
+        return True
+    # Zeitstempel geändert (z.B. nach git checkout): Inhalt vergleichen
+    return entry.get("sha256") == file_sha256(source_path)
+
+
+def build_snapshot(workbook, base_path="Data", manifest=None):
+    """Converts one workbook into a typed Parquet snapshot and records it in the manifest."""
+    source_path = os.path.join(base_path, workbook)
+    snapshot_path = _snapshot_path(base_path, workbook)
+    os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+
+    df = to_typed_frame(read_excel(source_path))
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, snapshot_path)
+
+    stat = os.stat(source_path)
+    entry = {
+        "snapshot": os.path.basename(snapshot_path),
+        "sha256": file_sha256(source_path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        **snapshot_versions(),
+    }
+    if manifest is not None:
+        manifest[workbook] = entry
+        return df
+
+    # Mehrere Prozesse (paralleles Laden) bauen gleichzeitig Snapshots:
+    # das Manifest unter Sperre neu lesen, damit kein Eintrag verloren geht
+    with FileLock(os.path.join(_snapshot_dir(base_path), MANIFEST_NAME + ".lock")):
+        manifest = load_manifest(base_path)
+        manifest[workbook] = entry
+        _save_manifest(base_path, manifest)
+    return df
+
+
+def build_snapshots(base_path="Data", force=False):
+    """
+    Builds the Parquet snapshots for all workbooks in WORKBOOKS.
+
+    Only snapshots whose source changed (or that do not exist yet) are rebuilt,
+    unless force is set. Returns the names of the rebuilt workbooks.
+    """
+    manifest = load_manifest(base_path)
+    rebuilt = []
+    for workbook in WORKBOOKS.values():
+        source_path = os.path.join(base_path, workbook)
+        snapshot_path = _snapshot_path(base_path, workbook)
+        if not force and _entry_is_fresh(manifest.get(workbook), source_path, snapshot_path):
+            continue
+        build_snapshot(workbook, base_path, manifest)
+        rebuilt.append(workbook)
+    if rebuilt:
+        _save_manifest(base_path, manifest)
+    return rebuilt
+
+
+def read_workbook(path):
+    """
+    Reads an Excel workbook through its Parquet snapshot.
+
+    A stale or missing snapshot is rebuilt first. Without pyarrow the workbook
+    is read directly (excel_reader.read_excel).
+    """
+    if not parquet_available():
+        return read_excel(path)
+
+    base_path, workbook = os.path.split(path)
+    snapshot_path = _snapshot_path(base_path, workbook)
+    manifest = load_manifest(base_path)
+    if not _entry_is_fresh(manifest.get(workbook), path, snapshot_path):
+        build_snapshot(workbook, base_path)
+    return from_typed_frame(pd.read_parquet(snapshot_path))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build Parquet snapshots of the Excel sources in Data/.")
+    parser.add_argument("--data", default="Data", help="Data directory (default: Data)")
+    parser.add_argument("--force", action="store_true", help="Rebuild all snapshots")
+    args = parser.parse_args()
+
+    rebuilt = build_snapshots(args.data, force=args.force)
+    print(f"Rebuilt {len(rebuilt)} snapshot(s): {', '.join(rebuilt) if rebuilt else '-'}")
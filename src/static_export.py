@@ -0,0 +1,232 @@
+"""
+Static export of the dashboard: every tab as a plain HTML page.
+
+    python src/static_export.py                  # writes site/
+    python src/static_export.py public --data-dir Data
+
+The content comes from dashboard.py (the same functions the Streamlit app
+renders). Bokeh figures are embedded with bokeh.embed.components, the BokehJS
+files they need are copied once to static/ and shared by all pages,
+Matplotlib figures are written as PNGs to figures/, the full-resolution
+exports of the plot functions to exports/. The result can be served
+by any static file server (e.g. `python -m http.server -d site`).
+"""
+
+import functools
+import html
+import importlib.util
+import os
+import re
+import shutil
+import textwrap
+
+import bokeh
+from bokeh.embed import components
+from bokeh.embed.bundle import bundle_for_objs_and_resources
+from bokeh.resources import Resources
+
+from dashboard import PAGE_TITLE, TABS, overview
+from plots.export import figure_exporter
+from plots.figure_cache import figure_cache
+from utils import load_all_data
+
+# Radio-Buttons ohne JavaScript: die gewählte Variante wird sichtbar. Versteckte
+# Varianten behalten ihre Breite (nicht display: none), damit Bokeh sie richtig layoutet.
+MAX_CHOICE_OPTIONS = 6
+STYLE = """
+body { font-family: "Source Sans Pro", sans-serif; max-width: 1200px; margin: 0 auto; padding: 1rem 2rem; color: #31333f; line-height: 1.6; }
+nav { display: flex; gap: 1.5rem; border-bottom: 1px solid #ddd; margin: 2rem 0 1rem; }
+nav a { padding: 0.5rem 0; color: inherit; text-decoration: none; }
+nav a.active { color: #ff4b4b; border-bottom: 2px solid #ff4b4b; }
+hr { border: none; border-top: 1px solid #ddd; margin: 2rem 0; }
+blockquote { border-left: 3px solid #ddd; margin-left: 0; padding-left: 1rem; color: #555; }
+.plain { white-space: pre-wrap; }
+.choice .option { visibility: hidden; height: 0; overflow: hidden; }
+""" + "".join(
+    f".choice input:nth-of-type({i}):checked ~ .option:nth-of-type({i}) {{ visibility: visible; height: auto; }}\n"
+    for i in range(1, MAX_CHOICE_OPTIONS + 1)
+)
+
+ACTIVE = ' class="active"'
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<link rel="stylesheet" href="static/style.css">
+{scripts}
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _markdown_parser():
+    from markdown_it import MarkdownIt
+
+    return MarkdownIt("commonmark").enable(["table", "strikethrough"])
+
+
+def render_markdown(text):
+    """Markdown as in st.markdown (dedented); without markdown-it-py the text is shown as is."""
+    text = textwrap.dedent(text).strip()
+    if importlib.util.find_spec("markdown_it") is None:
+        return f'<div class="plain">{html.escape(text)}</div>'
+    return _markdown_parser().render(text)
+
+
+def page_filename(index, title):
+    if index == 0:
+        return "index.html"
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-") + ".html"
+
+
+class StaticPage:
+    """
+    Collects the content of one page as HTML.
+
+    Bokeh figures are built for this page only and remembered here; render()
+    embeds all of them with one bokeh.embed.components call, so the page
+    carries a single script with its documents.
+    """
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.parts = []
+        self.models = {}
+
+    def title(self, text):
+        self.parts.append(f"<h1>{html.escape(text)}</h1>")
+
+    def header(self, text):
+        self.parts.append(f"<h2>{html.escape(text)}</h2>")
+
+    def subheader(self, text):
+        self.parts.append(f"<h3>{html.escape(text)}</h3>")
+
+    def markdown(self, text):
+        self.parts.append(render_markdown(text))
+
+    def divider(self):
+        self.parts.append("<hr>")
+
+    def png(self, key, plot_func, *frames):
+        with open(os.path.join(self.out_dir, "figures", f"{key}.png"), "wb") as f:
+            f.write(figure_cache.get_png(plot_func, *frames))
+        self.parts.append(f'<img src="figures/{key}.png" width="950" alt="{html.escape(key)}">')
+
+    def bokeh(self, key, plot_func, *frames, use_container_width=False, choice=None):
+        # Frisch bauen statt aus figure_cache: components() hängt die Modelle an ein
+        # neues Dokument, ein Modell darf aber nur zu einem Dokument gehören
+        if choice is None:
+            self.models[key] = plot_func(*frames)
+            self.parts.append(("bokeh", key))
+            return
+
+        # Alle Varianten exportieren, der Leser wählt per Radio-Button
+        label, parameter, options = choice
+        if len(options) > MAX_CHOICE_OPTIONS:
+            raise ValueError(f"{key}: at most {MAX_CHOICE_OPTIONS} options can be exported")
+        self.parts.append(f'<div class="choice"><p>{html.escape(label)}</p>')
+        for i, option in enumerate(options):
+            checked = " checked" if i == 0 else ""
+            self.parts.append(
+                f'<input type="radio" name="{key}" id="{key}-{i}"{checked}> '
+                f'<label for="{key}-{i}">{html.escape(option)}</label>'
+            )
+        for i, option in enumerate(options):
+            self.models[f"{key}-{i}"] = plot_func(*frames, **{parameter: option})
+            self.parts.append('<div class="option">')
+            self.parts.append(("bokeh", f"{key}-{i}"))
+            self.parts.append("</div>")
+        self.parts.append("</div>")
+
+    def render(self):
+        """(script, body html) of the page."""
+        script, divs = components(self.models) if self.models else ("", {})
+        body = "\n".join(divs[part[1]] if isinstance(part, tuple) else part for part in self.parts)
+        return script, body
+
+
+def copy_bokehjs(models, out_dir):
+    """Copies the BokehJS files needed by models to static/; returns the script tags for the pages."""
+    bundle = bundle_for_objs_and_resources(models, Resources(mode="absolute"))
+    js_dir = os.path.join(out_dir, "static", f"bokeh-{bokeh.__version__}")
+    os.makedirs(js_dir, exist_ok=True)
+    tags = []
+    for url in bundle.js_files:
+        name = os.path.basename(url.url)
+        shutil.copyfile(url.url, os.path.join(js_dir, name))
+        tags.append(f'<script src="static/bokeh-{bokeh.__version__}/{name}"></script>')
+    tags += [f"<script>{raw}</script>" for raw in bundle.js_raw]
+    return "\n".join(tags)
+
+
+def export_site(out_dir="site", data=None):
+    """
+    Renders the overview and every tab of the dashboard to out_dir.
+
+    Every tab becomes its own page (the first one is index.html) with the
+    overview and a navigation on top, like the tabs of the app.
+
+    Returns:
+        list: paths of the written pages.
+    """
+    data = data if data is not None else load_all_data()
+    # Die Exporte der Plot-Funktionen landen in out_dir, nicht in src/plots/save_figures
+    previous_dir = figure_exporter.directory
+    figure_exporter.configure(directory=os.path.join(out_dir, "exports"))
+    try:
+        return _export_pages(out_dir, data)
+    finally:
+        figure_exporter.wait()
+        figure_exporter.configure(directory=previous_dir)
+
+
+def _export_pages(out_dir, data):
+    os.makedirs(os.path.join(out_dir, "figures"), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, "static"), exist_ok=True)
+    with open(os.path.join(out_dir, "static", "style.css"), "w", encoding="utf-8") as f:
+        f.write(STYLE)
+
+    intro = StaticPage(out_dir)
+    overview(intro)
+    _, intro_html = intro.render()
+
+    filenames = [page_filename(i, title) for i, (title, _) in enumerate(TABS)]
+    pages = []
+    for i, (title, tab_content) in enumerate(TABS):
+        nav = "".join(
+            f'<a href="{filename}"{ACTIVE if j == i else ""}>{html.escape(tab_title)}</a>'
+            for j, ((tab_title, _), filename) in enumerate(zip(TABS, filenames))
+        )
+        page = StaticPage(out_dir)
+        tab_content(page, data)
+        script, body = page.render()
+        pages.append((filenames[i], title, page.models, script, f"{intro_html}\n<nav>{nav}</nav>\n{body}"))
+
+    # Ein gemeinsamer Satz BokehJS-Dateien für alle Seiten
+    bokehjs = copy_bokehjs([model for page in pages for model in page[2].values()], out_dir)
+
+    paths = []
+    for filename, title, models, script, body in pages:
+        path = os.path.join(out_dir, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(PAGE.format(title=html.escape(f"{title} – {PAGE_TITLE}"), scripts=f"{bokehjs}\n{script}" if models else "", body=body))
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render every tab of the dashboard to a static site.")
+    parser.add_argument("out_dir", nargs="?", default="site", help="Output directory (default: site)")
+    parser.add_argument("--data-dir", default="Data", help="Directory with the source files (default: Data)")
+    args = parser.parse_args()
+
+    for path in export_site(args.out_dir, load_all_data(base_path=args.data_dir)):
+        print(f"{path} ({os.path.getsize(path) / 1024:.0f} kB)")
@@ -0,0 +1,254 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from excel_reader import read_excel
+from snapshots import WORKBOOKS
+from utils import DATASET3_WORKBOOK
+
+CANTONS = [
+    "ZH", "BE", "LU", "UR", "SZ", "OW", "NW", "GL", "ZG", "FR", "SO", "BS", "BL",
+    "SH", "AR", "AI", "SG", "GR", "AG", "TG", "TI", "VD", "VS", "NE", "GE",
+]
+MONTH_NAMES = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+]
+
+# pandas-Zeitstempel (Nanosekunden) enden am 11.04.2262
+MAX_DATE = pd.Timestamp("2262-01-01")
+
+# Grösse der mitgelieferten Daten (Jahre bzw. Tage) bei scale=1
+BASE_SIZES = {
+    "dataset1_years": 143,
+    "mortality_years": 6,
+    "incidence_years": 6,
+    "population_years": 21,
+    "dataset3_years": 127,
+    "covid_days": 1096,
+}
+
+
+def canton_names(n):
+    """The real canton codes, then K26, K27, ... for more cantons."""
+    return CANTONS[:n] + [f"K{i}" for i in range(len(CANTONS), n)]
+
+
+def _seasonal(dates, rng, base, amplitude):
+    # Grippe-Saison: Maximum im Januar/Februar, dazu zufällige Epidemiejahre
+    phase = np.cos(2 * np.pi * (dates.dayofyear.to_numpy() - 30) / 365.25)
+    epidemic = rng.random(len(dates.year.unique())) < 0.15
+    boost = pd.Series(np.where(epidemic, 8.0, 1.0), index=dates.year.unique()).reindex(dates.year).to_numpy()
+    return base * (1 + amplitude * np.clip(phase, 0, None)) * boost
+
+
+def _cantonal(totals, cantons, rng):
+    # Gesamtzahlen nach festen Gewichten auf die Kantone verteilen
+    weights = rng.dirichlet(np.full(len(cantons), 2.0))
+    return pd.DataFrame(rng.poisson(np.outer(totals, weights)), columns=cantons)
+
+
+def generate_dataset1(years=143, start_year=1880, seed=0):
+    """1_History_Pandemics: one row per year."""
+    rng = np.random.default_rng(seed)
+    year = np.arange(start_year, start_year + years)
+    population = np.round(2_840_000 * np.exp(0.0079 * (year - start_year))).astype("int64")
+    flu_rate = rng.gamma(1.5, 3.0, years)
+    flu_rate[rng.random(years) < 0.05] *= 25
+    covid = year >= 2020
+    flu = np.where(covid, np.nan, np.round(flu_rate * population / 100_000))
+    covid_deaths = np.where(covid, rng.integers(3000, 10000, years), np.nan)
+    excess = np.round(rng.normal(0, 5, years), 1)
+    return pd.DataFrame({
+        "Jahr": year,
+        "Todesfälle_Grippe_100000": flu / population * 100_000,
+        "Todesfälle_Covid_100000": covid_deaths / population * 100_000,
+        "TodesfälleGrippe": flu,
+        "TodesfälleCOVID": covid_deaths,
+        "Population": population,
+        "Überasterblichkeit_Alles": excess,
+        "ÜberasterblichkeitPlus": np.where(excess > 0, excess, np.nan),
+        "ÜberasterblichkeitMinus": np.where(excess < 0, excess, np.nan),
+    })
+
+
+def generate_mortality(years=6, start_year=1953, cantons=25, seed=0):
+    """2_All_cantons_*_Mortality: monthly influenza and total deaths per canton plus CH."""
+    rng = np.random.default_rng(seed)
+    names = canton_names(cantons)
+    dates = pd.date_range(f"{start_year}-01-01", periods=12 * years, freq="MS")
+    influenza = _seasonal(dates, rng, 30 * cantons / 25, 4)
+    total = rng.normal(4200, 300, len(dates)) * cantons / 25 + influenza
+
+    frames = []
+    # Wie im Original: "Total deaths" ab der zweiten Hälfte statt "Deaths Total"
+    total_label = np.where(np.arange(len(dates)) < len(dates) // 2, "Deaths Total", "Total deaths")
+    for parameter, totals in (("Deaths Influenza", influenza), ("Total", total)):
+        values = _cantonal(totals, names, rng).astype("float64")
+        values["CH"] = values.sum(axis=1)
+        values.insert(0, "Parameter", parameter if parameter != "Total" else total_label)
+        values.insert(0, "Year", dates.year)
+        values.insert(0, "Month", [MONTH_NAMES[m - 1] for m in dates.month])
+        frames.append(values)
+    return pd.concat(frames, ignore_index=True)
+
+
+def generate_incidence(years=6, start="1952-12-14", cantons=25, resolution="weekly", seed=0):
+    """2_Data_cantons_incidence_weekly: influenza cases per reporting period (weekly or daily)."""
+    rng = np.random.default_rng(seed)
+    names = canton_names(cantons)
+    step = 7 if resolution == "weekly" else 1
+    starts = pd.date_range(start, periods=int(years * 365.25 / step), freq=f"{step}D")
+    cases = _seasonal(starts, rng, 15 * step * cantons / 25, 6)
+
+    values = _cantonal(cases, names, rng)
+    values["CH"] = values.sum(axis=1)
+    values.insert(0, "Parameter", "Cases Influenza")
+    values.insert(0, "Month", starts.month)
+    values.insert(0, "EndReportingPeriod", starts + pd.Timedelta(days=step - 1))
+    values.insert(0, "StartReportingPeriod", starts)
+    return values
+
+
+def generate_population(years=21, start_year=1950, cantons=25, seed=0):
+    """2_Population_cantons: population per canton and year plus CH."""
+    rng = np.random.default_rng(seed)
+    names = canton_names(cantons)
+    base = rng.integers(13_000, 800_000, cantons)
+    growth = rng.normal(0.012, 0.006, cantons)
+    t = np.arange(years)[:, None]
+    values = pd.DataFrame(np.round(base * np.exp(growth * t), -2).astype("int64"), columns=names)
+    values["CH"] = values.sum(axis=1)
+    values.insert(0, "Year", np.arange(start_year, start_year + years))
+    return values
+
+
+def _dataset3_template(template_path):
+    # Kopfzeilen (0-8) und Fussnoten aus dem echten Blatt übernehmen, sonst generisch
+    if template_path and os.path.exists(template_path):
+        raw = read_excel(template_path, sheet_name="Tabelle1", header=None)
+        years = pd.to_numeric(raw.iloc[9:, 0], errors="coerce")
+        footer_start = years.last_valid_index() + 1
+        return raw.iloc[:9], raw.iloc[footer_start:]
+
+    header = pd.DataFrame(np.nan, index=range(9), columns=range(82), dtype=object)
+    header.iloc[0, 0] = "T  14.1.1.4"
+    header.iloc[0, 1] = "Todesursachen nach Organerkrankungen (synthetisch)"
+    header.iloc[3, 0] = "Jahr"
+    for col in range(1, 82):
+        header.iloc[3, col] = f"Gruppe {(col - 1) // 6 + 1}" if (col - 1) % 6 == 0 else np.nan
+        header.iloc[5, col] = "Total" if (col - 1) % 6 == 0 else f"Ursache {col}"
+    footer = pd.DataFrame({0: ["", "Quelle: synthetische Daten"]}).reindex(columns=range(82))
+    return header, footer
+
+
+def generate_causes_of_death(years=127, start_year=1876, template_path=None, seed=0):
+    """
+    3_Todesursachen: the raw sheet (header rows, one row per year, footnotes).
+
+    Returned without header, exactly as the sheet is laid out.
+    """
+    rng = np.random.default_rng(seed)
+    header, footer = _dataset3_template(template_path)
+    n_cols = header.shape[1]
+    body = pd.DataFrame(
+        rng.poisson(rng.integers(5, 3000, n_cols - 1), size=(years, n_cols - 1)),
+        columns=range(1, n_cols),
+    ).astype(object)
+    # Wie im Original: einzelne fehlende Werte als "..."
+    body = body.mask(rng.random(body.shape) < 0.01, "...")
+    body.insert(0, 0, np.arange(start_year, start_year + years))
+    return pd.concat([header, body, footer], ignore_index=True)
+
+
+def generate_covid(days=1096, countries=1, start="2020-01-01", seed=0):
+    """OWID full_data.csv: daily cases and deaths per location (Switzerland first)."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=days, freq="D")
+    locations = ["Switzerland"] + [f"Country {i}" for i in range(2, countries + 1)]
+    wave = 1 + np.sin(2 * np.pi * np.arange(days) / 240) ** 2 * 20
+
+    frames = []
+    for location in locations:
+        new_cases = rng.poisson(wave * rng.uniform(50, 500))
+        new_deaths = rng.poisson(new_cases * 0.01)
+        frame = pd.DataFrame({
+            "date": dates.strftime("%Y-%m-%d"),
+            "location": location,
+            "new_cases": new_cases,
+            "new_deaths": new_deaths,
+            "total_cases": new_cases.cumsum(),
+            "total_deaths": new_deaths.cumsum(),
+        })
+        frame["weekly_cases"] = frame["new_cases"].rolling(7).sum()
+        frame["weekly_deaths"] = frame["new_deaths"].rolling(7).sum()
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _clamp_years(name, years, start):
+    last = pd.Timestamp(start) + pd.DateOffset(years=years)
+    if last < MAX_DATE:
+        return years
+    clamped = MAX_DATE.year - pd.Timestamp(start).year - 1
+    warnings.warn(f"{name}: {years} years would end after {MAX_DATE.date()}, using {clamped}")
+    return clamped
+
+
+def write_synthetic_data(out_dir, scale=1, cantons=25, resolution="weekly", countries=1, seed=0,
+                         template_dir="Data"):
+    """
+    Writes schema-compatible synthetic versions of all Data/ files to out_dir.
+
+    scale multiplies the time span of every dataset (years, or days for the
+    COVID data). Date-based datasets are clamped before the end of the pandas
+    timestamp range. The result can be read with load_all_data(base_path=out_dir).
+
+    Returns:
+        dict: file name -> number of data rows.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    sizes = {key: value * scale for key, value in BASE_SIZES.items()}
+    mortality_years = _clamp_years("mortality", sizes["mortality_years"], "1953-01-01")
+    incidence_years = _clamp_years("incidence", sizes["incidence_years"], "1952-12-14")
+    covid_days = min(sizes["covid_days"], (MAX_DATE - pd.Timestamp("2020-01-01")).days)
+
+    frames = {
+        WORKBOOKS["data_set1"]: generate_dataset1(sizes["dataset1_years"], seed=seed),
+        WORKBOOKS["data_set2_mortality"]: generate_mortality(mortality_years, cantons=cantons, seed=seed),
+        WORKBOOKS["data_set2_incidence_weekly"]: generate_incidence(incidence_years, cantons=cantons, resolution=resolution, seed=seed),
+        WORKBOOKS["data_set2_population"]: generate_population(sizes["population_years"], cantons=cantons, seed=seed),
+    }
+    rows = {}
+    for workbook, df in frames.items():
+        df.to_excel(os.path.join(out_dir, workbook), index=False)
+        rows[workbook] = len(df)
+
+    template = os.path.join(template_dir, DATASET3_WORKBOOK) if template_dir else None
+    raw3 = generate_causes_of_death(sizes["dataset3_years"], template_path=template, seed=seed)
+    raw3.to_excel(os.path.join(out_dir, DATASET3_WORKBOOK), sheet_name="Tabelle1", header=False, index=False)
+    rows[DATASET3_WORKBOOK] = sizes["dataset3_years"]
+
+    covid = generate_covid(covid_days, countries, seed=seed)
+    covid.to_csv(os.path.join(out_dir, "full_data.csv"), index=False)
+    rows["full_data.csv"] = len(covid)
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write synthetic, schema-compatible versions of the Data/ files.")
+    parser.add_argument("out_dir", help="Output directory (use it with load_all_data(base_path=...))")
+    parser.add_argument("--scale", type=int, default=1, help="Multiplies the time span of every dataset")
+    parser.add_argument("--cantons", type=int, default=25, help="Number of cantons in dataset 2")
+    parser.add_argument("--resolution", choices=["weekly", "daily"], default="weekly", help="Reporting period of the incidence data")
+    parser.add_argument("--countries", type=int, default=1, help="Number of locations in full_data.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = write_synthetic_data(args.out_dir, args.scale, args.cantons, args.resolution, args.countries, args.seed)
+    for name, n in rows.items():
+        print(f"{name}: {n} rows")
@@ -1,79 +1,449 @@
 import pandas as pd
 import os
+import json
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
 
-def clean_dataset3(file_path, save_path_csv):
-    df = pd.read_excel(file_path, sheet_name="Tabelle1")
-
-    raw_headers = df.iloc[5].tolist()
-    clean_headers = []
-    seen = {}
-    for i, h in enumerate(raw_headers):
-        if pd.isna(h) or str(h).strip() == "":
-            h = f"Unnamed_{i}"
-        else:
-            h = str(h).strip()
-        if h in seen:
-            seen[h] += 1
-            h = f"{h}_{seen[h]}"
-        else:
-            seen[h] = 1
-        clean_headers.append(h)
-
-    data = df.iloc[7:].copy()
-    data.columns = clean_headers
-    data = data.rename(columns={clean_headers[0]: "Year"})
+from instrumentation import measure, record_timing
+from plots.prep import set_data_version
+from excel_reader import read_excel
+from excel_headers import column_letter, combine_header_rows, read_body, read_sheet_with_headers
+from shared_cache import shared_reader
+from snapshots import FileLock, file_sha256, read_workbook
+
+# Prozessweiter Cache: (Pfad, Reader, Optionen) -> ((mtime, size), DataFrame)
+_data_cache = {}
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def cached_read(path, reader, **kwargs):
+    """
+    Reads a source file once per process and returns the cached frame on later calls.
+
+    The entry is keyed by the absolute path, the reader and its options, and is only
+    re-read when the file's mtime or size changed. The returned frame is shared
+    between reruns, so callers must copy it before modifying it.
+    """
+    key = (os.path.abspath(path), reader.__name__, tuple(sorted(kwargs.items())))
+    signature = _source_signature(path)
+
+    entry = _data_cache.get(key)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+
+    return _store_cached(key, signature, reader(path, **kwargs))
+
+
+def _store_cached(key, signature, df):
+    # Version der Quelle, daran erkennen abgeleitete Caches (plots/prep.py) Änderungen
+    set_data_version(df, f"{key[0]}:{signature[0]}:{signature[1]}")
+    _data_cache[key] = (signature, df)
+    return df
+
+
+def is_cached(path, reader, **kwargs):
+    """True if cached_read would return the frame for path without reading the file."""
+    key = (os.path.abspath(path), reader.__name__, tuple(sorted(kwargs.items())))
+    entry = _data_cache.get(key)
+    return entry is not None and os.path.exists(path) and entry[0] == _source_signature(path)
+
+
+def clear_data_cache(path=None):
+    """Drops all cached frames, or only those read from the given path."""
+    if path is None:
+        _data_cache.clear()
+        return
+    abs_path = os.path.abspath(path)
+    for key in [k for k in _data_cache if k[0] == abs_path]:
+        del _data_cache[key]
+
+
+DATASET3_WORKBOOK = "3_Todesursachen Schweiz ohne Alter 1876-2002.xlsx"
+CLEANING_MANIFEST = "cleaning_manifest.json"
+
+# Version der Bereinigungslogik je Ausgabe: erhöhen, wenn sich der Code ändert,
+# damit refresh_dataset3_outputs die Datei neu schreibt
+CLEANING_VERSIONS = {
+    "data_set3_cleaned.csv": 2,
+    "dataset_3_cleaned_infectious_diseases.csv": 1,
+}
+
+
+def read_dataset3_raw(file_path):
+    # Ohne Header lesen: die Kopfzeilen werden in den Bereinigungsfunktionen zusammengesetzt
+    return read_excel(file_path, sheet_name="Tabelle1", header=None)
+
+
+INFECTIOUS_COLUMNS = [
+    "Year", "Total", "Smallpox", "Scarlet_Fever", "Measles",
+    "Typhoid_Paratyphoid", "Diphtheria", "Whooping_Cough"
+]
+
+
+def _finish_infectious(body):
+    # Spalten A-H: Jahr, Total und die sechs Infektionskrankheiten
+    data = body.copy()
+    data.columns = INFECTIOUS_COLUMNS
     data = data[pd.to_numeric(data["Year"], errors="coerce").notnull()]
     data["Year"] = data["Year"].astype(int)
-    data = data.iloc[:, 0:8]
+    return data
+
+
+def _dataset3_infectious(raw):
+    return _finish_infectious(raw.iloc[8:, 0:8])
+
+
+def _dataset3_headers(raw):
+    combined_headers = combine_header_rows(raw.iloc[3:6])
+
+    data = raw.iloc[9:].copy()
+    data.columns = combined_headers.reindex([column_letter(i) for i in range(raw.shape[1])], fill_value="").values
+    return data.reset_index(drop=True)
+
+
+def _tmp_path(path):
+    # Eindeutig je Prozess und Thread (Streamlit-Sessions laufen als Threads)
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _write_csv(data, path, index):
+    tmp_path = _tmp_path(path)
+    data.to_csv(tmp_path, index=index)
+    os.replace(tmp_path, path)
 
-    data.columns = [
-        "Year", "Total", "Smallpox", "Scarlet_Fever", "Measles",
-        "Typhoid_Paratyphoid", "Diphtheria", "Whooping_Cough"
-    ]
 
-    data.to_csv(save_path_csv, index=False)
+# Ausgabe -> (Bereinigung aus dem Rohblatt, Index mitschreiben)
+DATASET3_OUTPUTS = {
+    "data_set3_cleaned.csv": (_dataset3_headers, True),
+    "dataset_3_cleaned_infectious_diseases.csv": (_dataset3_infectious, False),
+}
+
+
+def clean_dataset3(file_path, save_path_csv):
+    # Nur die Spalten A-H ab der ersten Datenzeile lesen
+    data = _finish_infectious(read_body(file_path, 8, columns=list("ABCDEFGH"), sheet_name="Tabelle1"))
+    _write_csv(data, save_path_csv, index=False)
     return data
 
 
 def clean_dataset3_headers(file_path, save_path_csv):
-    df = pd.read_excel(file_path)
-    header_rows = df.iloc[3:6].fillna(method='ffill', axis=1)
-    combined_headers = header_rows.apply(lambda x: ' | '.join(x.dropna().astype(str)), axis=0)
+    # Kopfzeilen 3-5 zusammensetzen, Daten ab Zeile 9
+    data, _ = read_sheet_with_headers(file_path, 3, 3, 9, sheet_name="Tabelle1")
+    _write_csv(data, save_path_csv, index=True)
+    return data
 
-    data = df.iloc[9:].copy()
-    data.columns = combined_headers
-    data = data.reset_index(drop=True)
 
-    data.to_csv(save_path_csv, index=False)
-    return data
+def _load_json(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
 
 
-def load_all_data():
-    base_path = "Data"
+def refresh_dataset3_outputs(base_path="Data", force=False):
+    """
+    Re-emits the cleaned dataset 3 CSVs whose source or cleaning version changed.
 
-    # Cleaned datasets
-    cleaned1_path = os.path.join(base_path, "data_set3_cleaned.csv")
-    cleaned2_path = os.path.join(base_path, "dataset_3_cleaned_infectious_diseases.csv")
+    The workbook is parsed at most once for all stale outputs. The manifest
+    (Data/cleaning_manifest.json) records the source sha256 and the cleaning
+    version each output was built from. Returns the names of the rewritten files.
+    """
+    source_path = os.path.join(base_path, DATASET3_WORKBOOK)
+    manifest_path = os.path.join(base_path, CLEANING_MANIFEST)
 
-    # Falls die CSVs noch nicht existieren, erstelle sie
-    if not os.path.exists(cleaned1_path):
-        clean_dataset3_headers(os.path.join(base_path, "3_Todesursachen Schweiz ohne Alter 1876-2002.xlsx"), cleaned1_path)
-
-    if not os.path.exists(cleaned2_path):
-        clean_dataset3(os.path.join(base_path, "3_Todesursachen Schweiz ohne Alter 1876-2002.xlsx"), cleaned2_path)
-
-    # Jetzt alle einlesen
-    data = {
-        "data_set1": pd.read_excel(os.path.join(base_path, "1_History_Pandemics.xlsx")),
-        "data_set2_mortality": pd.read_excel(os.path.join(base_path, "2_All_cantons_1953-1958_Mortality.xlsx")),
-        "data_set2_incidence_weekly": pd.read_excel(os.path.join(base_path, "2_Data_cantons_incidence_weekly_56_58_NEW.xlsx")),
-        "data_set2_population": pd.read_excel(os.path.join(base_path, "2_Population_cantons.xlsx")),
-        "data_set3": pd.read_excel(os.path.join(base_path, "3_Todesursachen Schweiz ohne Alter 1876-2002.xlsx")),
-        "data_set3_cleaned": pd.read_csv(cleaned1_path),
-        "data_covid": pd.read_csv(os.path.join(base_path, "full_data.csv")),
-        "dataset3_infectdata": pd.read_csv(cleaned2_path),
-    }
+    # Prüfen und Schreiben unter einer Sperre: startet eine zweite Session
+    # gleichzeitig kalt, findet sie danach die frischen Dateien vor
+    with FileLock(manifest_path + ".lock"):
+        manifest = _load_json(manifest_path)
+        sha256 = file_sha256(source_path)
 
-    return data
+        stale = [
+            name for name in DATASET3_OUTPUTS
+            if force
+            or not os.path.exists(os.path.join(base_path, name))
+            or manifest.get("outputs", {}).get(name) != {"sha256": sha256, "version": CLEANING_VERSIONS[name]}
+        ]
+
+        if stale:
+            raw = read_dataset3_raw(source_path)
+            for name in stale:
+                clean, index = DATASET3_OUTPUTS[name]
+                _write_csv(clean(raw), os.path.join(base_path, name), index=index)
+                manifest.setdefault("outputs", {})[name] = {"sha256": sha256, "version": CLEANING_VERSIONS[name]}
+
+            manifest["source"] = {"file": DATASET3_WORKBOOK, "sha256": sha256}
+            tmp_path = _tmp_path(manifest_path)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, manifest_path)
+    return stale
 
 
+COVID_COLUMNS = ("location", "date", "new_deaths")
+# Textspalten der OWID-Datei; alle anderen Spalten sind Zahlen
+COVID_TEXT_COLUMNS = ("location", "date", "iso_code", "continent")
+
+
+def read_covid_data(path, locations=("Switzerland",), columns=COVID_COLUMNS, engine="auto", chunksize=100_000):
+    """
+    Streams the OWID full_data.csv and keeps only the given locations and columns.
+
+    Args:
+        path (str): Path to full_data.csv.
+        locations (tuple): Locations to keep; None keeps all of them.
+        columns (tuple): Columns to read; "location" and "date" are always included.
+        engine (str): "pyarrow" (batched Arrow reader), "chunked" (pandas chunks) or "auto".
+        chunksize (int): Rows per chunk in the pandas mode.
+
+    Returns:
+        DataFrame: The filtered rows with "date" parsed as datetime.
+    """
+    columns = list(dict.fromkeys(["location", "date", *columns]))
+    if engine == "auto":
+        try:
+            import pyarrow.csv  # noqa: F401
+            engine = "pyarrow"
+        except ImportError:
+            engine = "chunked"
+
+    if engine == "pyarrow":
+        df = _read_covid_pyarrow(path, locations, columns)
+    elif engine == "chunked":
+        df = _read_covid_chunked(path, locations, columns, chunksize)
+    else:
+        raise ValueError(f"Unknown engine: {engine}")
+
+    # Datum nur einmal, auf dem bereits gefilterten Ausschnitt parsen
+    df["date"] = pd.to_datetime(df["date"])
+    return df.reset_index(drop=True)
+
+
+def _read_covid_pyarrow(path, locations, columns):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pv
+
+    # Typen fest vorgeben: sonst rät pyarrow sie aus dem ersten Block, und eine Spalte,
+    # die dort leer ist (null), bricht bei der ersten Zahl in einem späteren Block ab
+    column_types = {c: pa.string() if c in COVID_TEXT_COLUMNS else pa.float64() for c in columns}
+    reader = pv.open_csv(path, convert_options=pv.ConvertOptions(include_columns=columns, column_types=column_types))
+    batches = []
+    for batch in reader:
+        if locations is not None:
+            batch = batch.filter(pc.is_in(batch.column("location"), value_set=pa.array(list(locations))))
+        if batch.num_rows:
+            batches.append(batch)
+    table = pa.Table.from_batches(batches, schema=reader.schema)
+    return table.select(columns).to_pandas()
+
+
+def _read_covid_chunked(path, locations, columns, chunksize):
+    chunks = []
+    # Gleiche Typen wie im pyarrow-Modus
+    dtypes = {c: "float64" for c in columns if c not in COVID_TEXT_COLUMNS}
+    for chunk in pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunksize):
+        if locations is not None:
+            chunk = chunk[chunk["location"].isin(locations)]
+        chunks.append(chunk)
+    return pd.concat(chunks, ignore_index=True)[columns]
+
+
+class LazyDataRegistry(Mapping):
+    """
+    Read-only mapping of dataset name -> DataFrame that loads each frame on first access.
+
+    Args:
+        sources (dict): name -> (path, reader), read through cached_read.
+        prepare (dict): name -> callable that has to run before the first read
+            (e.g. creating a cleaned CSV).
+
+    Frames nobody asks for (e.g. the raw Todesursachen sheet) are never read.
+    """
+
+    def __init__(self, sources, prepare=None):
+        self._sources = dict(sources)
+        self._prepare = dict(prepare or {})
+        self._frames = {}
+
+    def __getitem__(self, name):
+        if name not in self._frames:
+            path, reader = self._sources[name]
+            if name in self._prepare:
+                with measure("prepare", name):
+                    self._prepare[name]()
+            with measure("load", name):
+                self._frames[name] = cached_read(path, reader)
+        return self._frames[name]
+
+    def __iter__(self):
+        return iter(self._sources)
+
+    def __len__(self):
+        return len(self._sources)
+
+    def is_loaded(self, name):
+        return name in self._frames
+
+    def loaded(self):
+        return [name for name in self._sources if name in self._frames]
+
+    def is_ready(self, name):
+        """True if the frame can be returned without reading its source (loaded or in the process cache)."""
+        if name in self._frames:
+            return True
+        path, reader = self._sources[name]
+        return is_cached(path, reader)
+
+    def warm(self, names=None, max_workers=None):
+        """
+        Loads the given datasets (default: all) and yields (name, seconds, error) after each one.
+
+        error is None, or the exception if the dataset could not be loaded (it
+        raises again on access). With max_workers the reads run in a process
+        pool (see warm_parallel).
+        """
+        if max_workers is not None:
+            yield from self.warm_parallel(names, max_workers)
+            return
+        for name in names or list(self._sources):
+            start = time.perf_counter()
+            try:
+                self[name]
+            except Exception as e:
+                yield name, time.perf_counter() - start, e
+                continue
+            yield name, time.perf_counter() - start, None
+
+    def warm_parallel(self, names=None, max_workers=None):
+        """
+        Reads the given datasets (default: all) in a process pool.
+
+        Each file is parsed in its own worker, so a cold start takes about as long
+        as the slowest file instead of the sum. Prepare steps run first (each one
+        once, also in the pool); the reads that depend on them follow. Yields
+        (name, seconds read in the worker, error) as the files finish; error is
+        the exception of a failed prepare step or read (e.g. a missing file),
+        such a dataset is not loaded and raises on access as usual.
+
+        Only worth it when the Excel files are parsed (stale or no snapshots):
+        reading fresh Parquet snapshots is faster than starting the workers.
+        """
+        requested = names or list(self._sources)
+        # Schon im Prozess-Cache: ohne Worker übernehmen
+        for name in requested:
+            if self.is_ready(name):
+                start = time.perf_counter()
+                self[name]
+                yield name, time.perf_counter() - start, None
+        names = [n for n in requested if not self.is_loaded(n)]
+        if not names:
+            return
+
+        prepares = {}
+        for name in names:
+            if name in self._prepare:
+                prepares.setdefault(id(self._prepare[name]), (self._prepare[name], []))[1].append(name)
+        independent = [n for n in names if n not in self._prepare]
+
+        with ProcessPoolExecutor(max_workers=max_workers or min(len(names), os.cpu_count() or 1)) as pool:
+            reads = {}
+
+            def submit(name):
+                path, reader = self._sources[name]
+                reads[pool.submit(_timed_read, path, reader)] = name
+
+            prepare_futures = {pool.submit(_timed_call, func): (i, dependent) for i, (func, dependent) in prepares.items()}
+            for name in independent:
+                submit(name)
+            for future in as_completed(prepare_futures):
+                _, dependent = prepare_futures[future]
+                try:
+                    record_timing("prepare", ",".join(dependent), future.result())
+                except Exception as e:
+                    for name in dependent:
+                        yield name, None, e
+                    continue
+                for name in dependent:
+                    submit(name)
+
+            for future in as_completed(reads):
+                name = reads[future]
+                try:
+                    df, seconds, signature = future.result()
+                except Exception as e:
+                    yield name, None, e
+                    continue
+                path, reader = self._sources[name]
+                key = (os.path.abspath(path), reader.__name__, ())
+                self._frames[name] = _store_cached(key, signature, df)
+                record_timing("load", name, seconds)
+                yield name, seconds, None
+
+
+def _timed_call(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _timed_read(path, reader):
+    # Signatur vor dem Lesen, wie in cached_read; eine fehlende Datei scheitert hier im Worker
+    signature = _source_signature(path)
+    start = time.perf_counter()
+    df = reader(path)
+    return df, time.perf_counter() - start, signature
+
+
+def load_all_data(use_snapshots=True, shared_dir=None, base_path="Data", parallel=False, max_workers=None):
+    """
+    Registry of all datasets (name -> DataFrame), loaded lazily on first access.
+
+    With parallel=True all files are read up front in a process pool of
+    max_workers processes (default: one per file, at most the CPU count).
+    """
+    # Excel-Dateien über Parquet-Snapshots lesen (siehe snapshots.py)
+    read_xlsx = read_workbook if use_snapshots else read_excel
+    read_csv, read_covid = pd.read_csv, read_covid_data
+
+    # Mehrere Streamlit-Prozesse: Frames einmal als Arrow-Datei veröffentlichen
+    # und in jedem Worker memory-mappen (siehe shared_cache.py)
+    if shared_dir is not None:
+        read_xlsx, read_csv, read_covid = (shared_reader(r, shared_dir or None) for r in (read_xlsx, read_csv, read_covid))
+    raw3_path = os.path.join(base_path, "3_Todesursachen Schweiz ohne Alter 1876-2002.xlsx")
+
+    # Cleaned datasets
+    cleaned1_path = os.path.join(base_path, "data_set3_cleaned.csv")
+    cleaned2_path = os.path.join(base_path, "dataset_3_cleaned_infectious_diseases.csv")
+
+    # Nichts wird hier gelesen (ausser mit parallel=True): jeder Datensatz wird erst
+    # beim ersten Zugriff geladen (bereits geladene Dateien kommen aus dem Cache)
+    refresh = partial(refresh_dataset3_outputs, base_path)
+    registry = LazyDataRegistry(
+        {
+            "data_set1": (os.path.join(base_path, "1_History_Pandemics.xlsx"), read_xlsx),
+            "data_set2_mortality": (os.path.join(base_path, "2_All_cantons_1953-1958_Mortality.xlsx"), read_xlsx),
+            "data_set2_incidence_weekly": (os.path.join(base_path, "2_Data_cantons_incidence_weekly_56_58_NEW.xlsx"), read_xlsx),
+            "data_set2_population": (os.path.join(base_path, "2_Population_cantons.xlsx"), read_xlsx),
+            "data_set3": (raw3_path, read_xlsx),
+            "data_set3_cleaned": (cleaned1_path, read_csv),
+            "data_covid": (os.path.join(base_path, "full_data.csv"), read_covid),
+            "dataset3_infectdata": (cleaned2_path, read_csv),
+        },
+        prepare={
+            # Bereinigte CSVs bei Bedarf neu erzeugen (ein Parse für beide)
+            "data_set3_cleaned": refresh,
+            "dataset3_infectdata": refresh,
+        },
+    )
+    if parallel:
+        # Fehler zeigen sich wie beim Lazy-Laden erst beim Zugriff
+        for _ in registry.warm_parallel(max_workers=max_workers):
+            pass
+    return registry
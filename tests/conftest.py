@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Die Module in src/ importieren sich gegenseitig ohne Paket (wie bei `streamlit run src/main.py`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
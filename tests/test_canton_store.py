@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pytest
+
+from canton_store import CantonStore
+from utils import load_all_data
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data")
+
+
+@pytest.fixture(scope="module")
+def wide():
+    data = load_all_data(base_path=DATA_DIR)
+    return data["data_set2_mortality"], data["data_set2_incidence_weekly"], data["data_set2_population"]
+
+
+@pytest.fixture(scope="module")
+def store(wide):
+    return CantonStore.from_frames(*wide)
+
+
+def test_index_is_sorted(store):
+    # Nur auf einem sortierten Index sind die Lookups binäre Suchen
+    assert store.values.index.is_monotonic_increasing
+    assert store.population.index.is_monotonic_increasing
+
+
+def test_query_matches_mortality_workbook(store, wide):
+    mortality = wide[0]
+    rows = mortality[(mortality["Parameter"].str.strip().str.lower() == "deaths influenza") & (mortality["Year"] == 1957)]
+    series = store.query("deaths influenza", "ZH", "1957-01-01", "1957-12-31")
+    assert len(series) == 12
+    np.testing.assert_array_equal(series.to_numpy(), rows["ZH"].to_numpy(dtype="float32"))
+
+
+def test_query_matches_weekly_cases(store, wide):
+    weekly = wide[1]
+    rows = weekly[weekly["StartReportingPeriod"].between("1957-10-01", "1957-10-31")]
+    series = store.query("cases influenza", "BE", "1957-10-01", "1957-10-31")
+    assert list(series.index) == list(rows["StartReportingPeriod"])
+    np.testing.assert_array_equal(series.to_numpy(), rows["BE"].to_numpy(dtype="float32"))
+
+
+def test_period_covers_every_canton(store, wide):
+    weekly = wide[1]
+    rows = weekly[weekly["StartReportingPeriod"].between("1957-10-01", "1957-10-31")].set_index("StartReportingPeriod")
+    period = store.period("cases influenza", "1957-10-01", "1957-10-31")
+    for canton in ("ZH", "BE", "TI"):
+        np.testing.assert_array_equal(period.loc[canton].to_numpy(), rows[canton].to_numpy(dtype="float32"))
+
+
+def test_rate_per_100k_uses_population_of_the_same_year(store, wide):
+    mortality, _, population = wide
+    rate = store.rate_per_100k("deaths influenza", "ZH", "1956-01-01", "1957-12-31")
+    rows = mortality[(mortality["Parameter"].str.strip().str.lower() == "deaths influenza") & mortality["Year"].between(1956, 1957)]
+    inhabitants = rows["Year"].map(population.set_index("Year")["ZH"])
+    expected = rows["ZH"].to_numpy(dtype="float32") / inhabitants.to_numpy() * 100_000
+    np.testing.assert_allclose(rate.to_numpy(), expected, rtol=1e-6)
+    assert list(rate.index.year) == list(rows["Year"])
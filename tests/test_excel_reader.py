@@ -0,0 +1,22 @@
+import os
+
+import pandas as pd
+import pytest
+
+from excel_reader import EXCEL_CALLS
+from snapshots import WORKBOOKS
+
+pytest.importorskip("python_calamine")
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data")
+CASES = [(name, call) for name in WORKBOOKS for call in (EXCEL_CALLS if name == "data_set3" else ["sheet"])]
+
+
+@pytest.mark.parametrize("name, call", CASES, ids=[f"{name}-{call}" for name, call in CASES])
+def test_calamine_matches_openpyxl(name, call):
+    # pd.read_excel direkt: excel_reader.read_excel würde bei einem Fehler still auf openpyxl wechseln
+    path = os.path.join(DATA_DIR, WORKBOOKS[name])
+    pd.testing.assert_frame_equal(
+        pd.read_excel(path, engine="calamine", **EXCEL_CALLS[call]),
+        pd.read_excel(path, engine="openpyxl", **EXCEL_CALLS[call]),
+    )